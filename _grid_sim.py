@@ -0,0 +1,193 @@
+"""
+Numerischer Backtest-Kern für den Pionex Futures Grid Bot.
+Wird mit Numba kompiliert, falls installiert - sonst läuft derselbe Code als reines Python.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba ist optional
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Spalten der Trade-Ausgabe von simulate()
+TRADE_BAR, TRADE_PRICE, TRADE_SIZE, TRADE_FEE, TRADE_PNL = range(5)
+
+
+@njit(cache=True)
+def _grow(a):
+    """Kapazität (erste Achse) verdoppeln"""
+    out = np.empty((a.shape[0] * 2,) + a.shape[1:], a.dtype)
+    out[:a.shape[0]] = a
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def exec_price(price, is_buy, slippage_rate, spread_rate, rnd):
+    """Ausführungspreis nach Slippage (price * slippage_rate * rnd) und Spread"""
+    slippage = price * slippage_rate * rnd
+    spread = price * spread_rate
+    if is_buy:
+        return price + slippage + spread
+    return price - slippage - spread
+
+
+@njit(cache=True)
+def liquidation_hit(current, liq, is_long):
+    """True, wenn der Kurs den Liquidationspreis erreicht hat"""
+    if is_long:
+        return current <= liq
+    return current >= liq
+
+
+@njit(cache=True, fastmath=True)
+def funding_fee(size, entry, rate, hours):
+    """Funding Fee = Positionswert * Funding Rate * (Stunden / 8)"""
+    return size * entry * rate * (hours / 8)
+
+
+@njit(cache=True)
+def _close(trades, n_tr, bar, entry, size, exit_px, slip, leverage, fee_rate, slippage_rate, spread_rate):
+    """Long-Position zum Preis exit_px schließen und als Trade-Zeile ablegen; gibt (trades, pnl - fee) zurück"""
+    executed = exec_price(exit_px, False, slippage_rate, spread_rate, slip)
+    pnl = (executed - entry) * size * leverage
+    sell_fee = size * executed * fee_rate
+    if n_tr == trades.shape[0]:
+        trades = _grow(trades)
+    trades[n_tr, TRADE_BAR] = bar
+    trades[n_tr, TRADE_PRICE] = executed
+    trades[n_tr, TRADE_SIZE] = size
+    trades[n_tr, TRADE_FEE] = sell_fee
+    trades[n_tr, TRADE_PNL] = pnl
+    return trades, pnl - sell_fee
+
+
+@njit(cache=True, fastmath=True)
+def simulate(close, grid_px, slip_rand, balance, investment, leverage, fee_rate,
+             slippage_rate, spread_rate, liquidation_buffer, funding_rate, funding_every,
+             abort_drawdown=0.0, check_every=0):
+    """
+    Grid-Backtest über alle Bars mit derselben Logik wie run_backtest (nur Long).
+    Mit abort_drawdown > 0 wird alle check_every Bars wie beim on_progress-Abbruch von run_backtest
+    geprüft und bei größerem Drawdown vorzeitig beendet (offene Positionen zum letzten Kurs geschlossen).
+    Gibt (balance, total_fees, funding_fees, liquidated, balances, trades, stopped, draws) zurück;
+    trades hat die Spalten TRADE_BAR ... TRADE_PNL. draws ist die Anzahl verbrauchter Slippage-Werte:
+    ist sie größer als slip_rand, wurden Werte wiederverwendet und der Aufrufer muss mit längerem slip_rand neu starten.
+    """
+    n = close.shape[0]
+    n_rand = slip_rand.shape[0]
+    r = 0
+
+    # Offene Positionen (SoA); höchstens eine pro Grid-Level, slot_of[k] = Slot der Position von Level k
+    pos = np.empty((max(16, 2 * grid_px.shape[0]), 3))  # entry, size, level
+    n_pos = 0
+    liq_idx = np.empty(pos.shape[0], np.int64)
+    slot_of = np.full(grid_px.shape[0], -1, np.int64)
+
+    trades = np.empty((1024, 5))
+    n_tr = 0
+    balances = np.empty(n)
+    total_fees = 0.0
+    funding_fees = 0.0
+    liquidated = 0
+    notional = 0.0  # laufende Summe entry * size wie PionexFuturesGridBot._notional
+    next_funding = 0
+    peak = balance
+    next_check = check_every if abort_drawdown > 0 and check_every > 0 else n
+    end = n
+    stopped = False
+
+    for i in range(n):
+        # Drawdown-Abbruch: Peak über die seit der letzten Prüfung abgeschlossenen Bars
+        if i == next_check:
+            next_check += check_every
+            for j in range(i - check_every, i):
+                if balances[j] > peak:
+                    peak = balances[j]
+            if (peak - balance) / peak > abort_drawdown:
+                end = i
+                stopped = True
+                break
+
+        price = close[i]
+
+        # Funding Fee alle `funding_every` Bars
+        if i == next_funding:
+            next_funding += funding_every
+            if n_pos > 0:
+                fee = notional * funding_rate
+                funding_fees += fee
+                total_fees += fee
+                balance -= fee
+
+        # Liquidationen: erst sammeln, dann in Reihenfolge per swap-pop entfernen
+        n_liq = 0
+        for j in range(n_pos):
+            pnl = (price - pos[j, 0]) * pos[j, 1] * leverage
+            if (pos[j, 1] + pnl) / pos[j, 1] < liquidation_buffer:
+                liq_idx[n_liq] = j
+                n_liq += 1
+        for k in range(n_liq):
+            j = liq_idx[k]
+            slot_of[int(pos[j, 2])] = -1
+            n_pos -= 1
+            notional = notional - pos[j, 1] * pos[j, 0] if n_pos else 0.0
+            if j != n_pos:
+                pos[j] = pos[n_pos]
+                slot_of[int(pos[j, 2])] = j
+            for m in range(k + 1, n_liq):
+                if liq_idx[m] == n_pos:
+                    liq_idx[m] = j
+        liquidated += n_liq
+
+        can_buy = balance > investment  # wie run_backtest: Kauf-Level nur, wenn der Kontostand zu Bar-Beginn reicht
+        for k in range(grid_px.shape[0]):
+            gp = grid_px[k]
+            slot = slot_of[k]
+            # Buy signal
+            if price <= gp and slot < 0:
+                if can_buy and balance > investment:
+                    size = investment * leverage / gp
+                    executed = exec_price(gp, True, slippage_rate, spread_rate, slip_rand[r % n_rand])
+                    r += 1
+                    total_fees += size * executed * fee_rate
+                    if n_pos == pos.shape[0]:
+                        pos = _grow(pos)
+                        liq_idx = _grow(liq_idx)
+                    pos[n_pos, 0] = executed
+                    pos[n_pos, 1] = size
+                    pos[n_pos, 2] = k
+                    slot_of[k] = n_pos
+                    n_pos += 1
+                    notional += size * executed
+            # Sell signal
+            elif price >= gp and slot >= 0:
+                trades, net = _close(trades, n_tr, i, pos[slot, 0], pos[slot, 1], gp, slip_rand[r % n_rand],
+                                     leverage, fee_rate, slippage_rate, spread_rate)
+                r += 1
+                n_tr += 1
+                total_fees += trades[n_tr - 1, TRADE_FEE]
+                balance += net
+                slot_of[k] = -1
+                n_pos -= 1
+                notional = notional - pos[slot, 1] * pos[slot, 0] if n_pos else 0.0
+                if slot != n_pos:
+                    pos[slot] = pos[n_pos]
+                    slot_of[int(pos[slot, 2])] = slot
+
+        balances[i] = balance
+
+    # Restliche Positionen zum letzten Kurs schließen
+    for j in range(n_pos):
+        trades, net = _close(trades, n_tr, end - 1, pos[j, 0], pos[j, 1], close[end - 1], slip_rand[r % n_rand],
+                             leverage, fee_rate, slippage_rate, spread_rate)
+        r += 1
+        n_tr += 1
+        total_fees += trades[n_tr - 1, TRADE_FEE]
+        balance += net
+
+    return balance, total_fees, funding_fees, liquidated, balances[:end], trades[:n_tr], stopped, r
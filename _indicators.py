@@ -0,0 +1,171 @@
+"""
+Technische Indikatoren als reine NumPy-Funktionen (ersetzt die `ta`-Library).
+Die Werte entsprechen den `ta`-Defaults (inkl. NaN-/Null-Vorlauf), laufen aber einmal
+vektorisiert über das ganze Array statt über pandas-Objekte und Python-Schleifen.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba ist optional
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _recur(y0, x, a, b):
+    """Lineare Rekursion y[0] = y0, y[i] = a * y[i-1] + b * x[i] (EWMA/Wilder-Glättung)"""
+    y = np.empty(x.shape[0])
+    if x.shape[0] == 0:
+        return y
+    y[0] = y0
+    for i in range(1, x.shape[0]):
+        y[i] = a * y[i - 1] + b * x[i]
+    return y
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """pandas ewm(alpha, adjust=False).mean() inkl. führender NaNs und min_periods"""
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out
+    start = valid[0]
+    out[start:] = _recur(x[start], x[start:], 1.0 - alpha, alpha)
+    out[start:start + min_periods - 1] = np.nan
+    return out
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    """Um eine Stelle verschieben, erste Stelle NaN (wie Series.shift(1))"""
+    out = np.empty(len(x))
+    out[0] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Relative Strength Index (Wilder, wie ta.momentum.RSIIndicator)"""
+    close = np.asarray(close, dtype=float)
+    diff = np.diff(close, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = _ewm(up, 1.0 / window, window)
+    ema_down = _ewm(down, 1.0 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple:
+    """MACD-Linie, Signal-Linie und Histogramm (wie ta.trend.MACD)"""
+    close = np.asarray(close, dtype=float)
+    line = _ewm(close, 2.0 / (fast + 1), fast) - _ewm(close, 2.0 / (slow + 1), slow)
+    sig = _ewm(line, 2.0 / (signal + 1), signal)
+    return line, sig, line - sig
+
+
+def bollinger(close: np.ndarray, window: int = 20, dev: float = 2.0) -> Tuple:
+    """Bollinger Bands (oben, Mitte, unten) mit Populations-Std wie ta.volatility.BollingerBands"""
+    close = np.asarray(close, dtype=float)
+    mid = np.full(len(close), np.nan)
+    std = np.full(len(close), np.nan)
+    if len(close) >= window:
+        win = np.lib.stride_tricks.sliding_window_view(close, window)
+        mid[window - 1:] = win.mean(axis=1)
+        std[window - 1:] = win.std(axis=1)
+    return mid + dev * std, mid, mid - dev * std
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, prev: np.ndarray = None) -> np.ndarray:
+    if prev is None:
+        prev = _shift(close)
+    tr = np.maximum.reduce([high - low, np.abs(high - prev), np.abs(low - prev)])
+    tr[0] = high[0] - low[0]  # keine Vorkerze: nur High-Low
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14,
+        prev_close: np.ndarray = None) -> np.ndarray:
+    """Average True Range (Wilder, Vorlauf 0 wie ta.volatility.AverageTrueRange)"""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    out = np.zeros(len(close))
+    if len(close) < window:
+        return out
+    tr = _true_range(high, low, close, prev_close)
+    out[window - 1:] = _recur(tr[:window].mean(), tr[window - 1:], (window - 1) / window, 1.0 / window)
+    return out
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14,
+        prev_close: np.ndarray = None) -> np.ndarray:
+    """Average Directional Index, Rechenweg identisch zu ta.trend.ADXIndicator"""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    n = len(close)
+    if n < 2 * window + 1:
+        return np.zeros(n)
+    if prev_close is None:
+        prev_close = _shift(close)
+    dm = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    diff_up = high - _shift(high)
+    diff_down = _shift(low) - low
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+    def smooth(v):
+        # Wilder-Summe ab Index window; der letzte Wert bleibt wie in ta auf 0
+        m = n - (window - 1)
+        out = np.zeros(m)
+        out[:m - 1] = _recur(v[1:window + 1].sum(), v[window:n], 1.0 - 1.0 / window, 1.0)
+        return out
+
+    trs, dip, din = smooth(dm), smooth(pos), smooth(neg)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_pos = np.where(trs != 0, 100 * dip / trs, 0.0)
+        di_neg = np.where(trs != 0, 100 * din / trs, 0.0)
+        dx = np.where(di_pos + di_neg != 0, 100 * np.abs((di_pos - di_neg) / (di_pos + di_neg)), 0.0)
+
+    m = len(trs)
+    out = np.zeros(m)
+    out[window:] = _recur(dx[:window].mean(), dx[window - 1:m - 1], (window - 1) / window, 1.0 / window)
+    return np.concatenate((np.zeros(window - 1), out))
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    """Einfacher gleitender Durchschnitt mit NaN-Vorlauf (wie rolling(window).mean())"""
+    x = np.asarray(x, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window).mean(axis=1)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Rollende Stichproben-Standardabweichung (ddof=1) mit NaN-Vorlauf (wie rolling(window).std())"""
+    x = np.asarray(x, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window).std(axis=1, ddof=1)
+    return out
+
+
+def compute_all(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                vol_window: int) -> Dict[str, np.ndarray]:
+    """Alle Indikator-Spalten für den Bot in einem Durchgang; Vorkerze und Renditen werden nur einmal gebildet"""
+    high, low, close, volume = (np.asarray(a, dtype=float) for a in (high, low, close, volume))
+    prev_close = _shift(close) if len(close) else close
+    out = {'rsi': rsi(close)}
+    out['macd'], out['macd_signal'], out['macd_hist'] = macd(close)
+    out['bb_upper'], out['bb_middle'], out['bb_lower'] = bollinger(close)
+    out['atr'] = atr(high, low, close, prev_close=prev_close)
+    out['volume_sma'] = sma(volume, 20)
+    out['adx'] = adx(high, low, close, prev_close=prev_close)
+    # Renditen für die rollende Volatilität (calculate_volatility)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close / prev_close - 1
+    out['vol_roll'] = rolling_std(returns, vol_window)
+    return out
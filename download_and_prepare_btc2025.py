@@ -1,55 +1,357 @@
+import gzip
+import hashlib
+import io
+import json
+import mmap
 import os
+import shutil
+import sys
 import requests
 import zipfile
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from typing import List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+from tqdm import tqdm
+
+try:
+    # Optional: ISA-L Inflate ist deutlich schneller als das zlib von CPython und API-kompatibel
+    from isal import isal_zlib
+    zipfile.zlib = isal_zlib
+except ImportError:
+    pass
+try:
+    # Optional: mehrere Threads für die gzip-Kompression der CSV
+    from isal import igzip_threaded
+except ImportError:
+    igzip_threaded = None
 
 BINANCE_URL = "https://data.binance.vision/data/spot/monthly/klines/BTCUSDT/1m/BTCUSDT-1m-{}.zip"
+# Für den laufenden Monat gibt es noch kein Monats-ZIP, nur Tagesdateien
+DAILY_URL = "https://data.binance.vision/data/spot/daily/klines/BTCUSDT/1m/BTCUSDT-1m-{}.zip"
+YEAR = 2025
 DATA_DIR = "data"
 OUT_FILE = os.path.join(DATA_DIR, "BTCUSDT_1m_2025_CSV.csv")
+PARQUET_FILE = os.path.join(DATA_DIR, "BTCUSDT_1m_2025.parquet")
+NPY_FILE = os.path.join(DATA_DIR, "BTCUSDT_1m_2025.npy")
+ROWCOUNTS_FILE = os.path.join(DATA_DIR, "rowcounts.json")
+SIG_FILE = OUT_FILE + ".sig"
+# CSV gzip-komprimiert schreiben (ca. 4x weniger Bytes auf der Platte), pd.read_csv liest .gz transparent
+CSV_GZIP = False
+CSV_FILE = OUT_FILE + ".gz" if CSV_GZIP else OUT_FILE
+# Monats-CSVs zusätzlich entpackt ablegen (nur falls andere Tools sie brauchen)
+EXTRACT_CSV = False
+MONTHS = range(1, 13)
+MAX_WORKERS = 8
+DOWNLOAD_ATTEMPTS = 3
+# Verbindungsabbrüche und Timeouts, auch beim Lesen aus r.raw (dort kommen sie direkt aus urllib3)
+DOWNLOAD_ERRORS = (requests.RequestException, Urllib3Error)
+# Große Dateien in parallelen Range-Teilen laden (umgeht Drosselung pro Verbindung)
+RANGE_PARTS = 4
+RANGE_MIN_SIZE = 8 << 20
+POOL_SIZE = MAX_WORKERS * RANGE_PARTS
+COLS = [
+    "open_time", "open", "high", "low", "close", "volume", "close_time",
+    "quote_asset_volume", "number_of_trades", "taker_buy_base", "taker_buy_quote", "ignore"
+]
+# Nur die ersten 6 Spalten werden gebraucht, der Rest wird vom Parser gar nicht erst angelegt
+USE = COLS[:6]
+# Kurse und Volumen passen in float32 (7 signifikante Stellen) - halbiert Speicher und kopierte Bytes
+PRICE_DTYPE = "float32"
+DTYPES = {"open_time": "int64", **{c: PRICE_DTYPE for c in ("open", "high", "low", "close", "volume")}}
+OUT_DTYPES = {"date": "datetime64[ms]", **{c: PRICE_DTYPE for c in ("open", "high", "low", "close", "volume eth")}}
+OUT_COLS = tuple(OUT_DTYPES)
+# Parser-Optionen einmalig aufbauen statt pro Monat Spalten-Index und DataFrame neu zu erzeugen
+READ_OPTIONS = pacsv.ReadOptions(column_names=COLS, block_size=1 << 20)
+CONVERT_OPTIONS = pacsv.ConvertOptions(
+    include_columns=USE,
+    column_types={c: pa.from_numpy_dtype(np.dtype(dt)) for c, dt in DTYPES.items()},
+)
+# Record-Layout für die .npy-Datei (28 Bytes pro Kerze, per np.load(..., mmap_mode='r') ohne Kopie lesbar)
+NPY_DTYPE = np.dtype([(k.replace(' ', '_'), dt) for k, dt in OUT_DTYPES.items()])
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
-all_data = []
-
-for month in range(1, 13):
-    ym = f"2025-{month:02d}"
-    zip_name = f"BTCUSDT-1m-{ym}.zip"
-    csv_name = f"BTCUSDT-1m-{ym}.csv"
-    zip_path = os.path.join(DATA_DIR, zip_name)
-    csv_path = os.path.join(DATA_DIR, csv_name)
-    url = BINANCE_URL.format(ym)
-    print(f"Lade {url} ...")
-    # Download ZIP falls nicht vorhanden
-    if not os.path.exists(zip_path):
-        r = requests.get(url)
-        if r.status_code == 200:
-            with open(zip_path, "wb") as f:
-                f.write(r.content)
-        else:
-            print(f"Warnung: {url} nicht gefunden!")
+
+def sha256_file(path: str) -> str:
+    """SHA-256 einer Datei direkt über das gemappte File berechnen"""
+    h = hashlib.sha256()
+    if os.path.getsize(path) == 0:
+        # Leere Dateien (z.B. abgebrochener Download) lassen sich nicht mappen
+        return h.hexdigest()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        h.update(mm)
+    return h.hexdigest()
+
+
+def expected_checksum(session: requests.Session, url: str, zip_path: str) -> Optional[str]:
+    """Binance-CHECKSUM zum ZIP holen (lokal zwischengespeichert), None falls nicht verfügbar"""
+    checksum_path = zip_path + ".CHECKSUM"
+    if not os.path.exists(checksum_path):
+        try:
+            r = session.get(url + ".CHECKSUM", timeout=10)
+        except requests.RequestException:
+            return None
+        if r.status_code != 200:
+            return None
+        with open(checksum_path, "w", encoding="utf-8") as f:
+            f.write(r.text)
+    with open(checksum_path, "r", encoding="utf-8") as f:
+        # Format: "<sha256>  BTCUSDT-1m-YYYY-MM.zip"
+        content = f.read().split()
+    return content[0].lower() if content else None
+
+
+def ranged_size(head: requests.Response) -> Optional[int]:
+    """Dateigröße aus der HEAD-Antwort, falls der Server Range-Requests unterstützt und sich die Aufteilung lohnt"""
+    size = int(head.headers.get("Content-Length", 0))
+    if head.headers.get("Accept-Ranges") != "bytes" or size < RANGE_MIN_SIZE:
+        return None
+    return size
+
+
+def download_ranged(session: requests.Session, url: str, path: str, size: int, parts: int = RANGE_PARTS) -> bool:
+    """Lädt die Datei in parallelen Byte-Bereichen und schreibt jeden Teil an seinen Offset.
+    False, wenn der Server einen Bereich nicht als 206 liefert (dann normaler GET)"""
+    bounds = [(i * size // parts, (i + 1) * size // parts - 1) for i in range(parts)]
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+    def get_part(bound: Tuple[int, int]) -> bool:
+        start, end = bound
+        with session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=30) as r:
+            if r.status_code != 206:
+                return False
+            with open(path, "r+b") as f:
+                f.seek(start)
+                shutil.copyfileobj(r.raw, f, length=1 << 20)
+        return True
+
+    with ThreadPoolExecutor(max_workers=parts) as pool:
+        return all(list(pool.map(get_part, bounds)))
+
+
+def month_files(month: int) -> List[Tuple[str, str]]:
+    """(URL, lokaler Pfad) aller ZIPs eines Monats: Monatsdatei, beim laufenden Monat die Tagesdateien bis gestern"""
+    today = datetime.utcnow().date()
+    ym = f"{YEAR}-{month:02d}"
+    if (YEAR, month) > (today.year, today.month):
+        return []
+    if (YEAR, month) == (today.year, today.month):
+        days = [f"{ym}-{day:02d}" for day in range(1, today.day)]
+        return [(DAILY_URL.format(d), os.path.join(DATA_DIR, f"BTCUSDT-1m-{d}.zip")) for d in days]
+    return [(BINANCE_URL.format(ym), os.path.join(DATA_DIR, f"BTCUSDT-1m-{ym}.zip"))]
+
+
+def fetch(session: requests.Session, url: str, zip_path: str):
+    """Lädt das ZIP (falls nicht vorhanden oder beschädigt) und gibt den Pfad zurück, sonst None"""
+    checksum = expected_checksum(session, url, zip_path)
+    if os.path.exists(zip_path) and (checksum is None or sha256_file(zip_path) == checksum):
+        return zip_path
+    # HEAD-Preflight: fehlende (noch nicht veröffentlichte) Monate ohne vollen GET überspringen
+    try:
+        head = session.head(url, timeout=10, allow_redirects=False)
+    except DOWNLOAD_ERRORS as e:
+        tqdm.write(f"Warnung: {url} nicht erreichbar: {e}")
+        return None
+    if head.status_code != 200:
+        tqdm.write(f"Warnung: {url} nicht gefunden!")
+        return None
+    size = ranged_size(head)
+    tmp_path = zip_path + ".part"
+    for _ in range(DOWNLOAD_ATTEMPTS):
+        try:
+            if size is not None and not download_ranged(session, url, tmp_path, size):
+                size = None  # Server liefert keine Teilbereiche: ab jetzt normaler GET
+            if size is None:
+                with session.get(url, stream=True, timeout=30) as r:
+                    if r.status_code != 200:
+                        tqdm.write(f"Warnung: {url} nicht gefunden!")
+                        break
+                    # Direkt auf die Platte streamen statt r.content im Speicher zu sammeln
+                    with open(tmp_path, "wb") as f:
+                        shutil.copyfileobj(r.raw, f, length=1 << 20)
+        except DOWNLOAD_ERRORS as e:
+            tqdm.write(f"Warnung: Download von {url} fehlgeschlagen ({e}), lade erneut ...")
             continue
-    # Entpacken
-    if not os.path.exists(csv_path):
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(DATA_DIR)
-    # Einlesen
-    df = pd.read_csv(csv_path, header=None)
-    df.columns = [
-        "open_time", "open", "high", "low", "close", "volume", "close_time",
-        "quote_asset_volume", "number_of_trades", "taker_buy_base", "taker_buy_quote", "ignore"
-    ]
-    # Zeitstempel umwandeln
-    df['date'] = pd.to_datetime(df['open_time'], unit='ms')
+        if checksum is None or sha256_file(tmp_path) == checksum:
+            os.replace(tmp_path, zip_path)
+            return zip_path
+        tqdm.write(f"Warnung: Prüfsumme von {url} stimmt nicht, lade erneut ...")
+    else:
+        tqdm.write(f"Warnung: {url} konnte nicht fehlerfrei geladen werden!")
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return None
+
+
+def read_zip(zip_path: str) -> pa.Table:
+    """Liest die Kline-CSV direkt aus dem ZIP in eine Arrow-Tabelle"""
+    # Direkt aus dem ZIP einlesen, ohne die CSV vorher auf die Platte zu entpacken.
+    # Das ZIP wird gemappt, damit der Page-Cache die Daten ohne stdio-Puffer liefert.
+    with pa.memory_map(zip_path, "r") as mm:
+        with zipfile.ZipFile(mm) as z:
+            name = z.namelist()[0]
+            with z.open(name) as raw:
+                buf = io.BufferedReader(raw, buffer_size=1 << 20)
+                # pyarrow parst multithreaded und gibt dabei den GIL frei
+                return pacsv.read_csv(buf, read_options=READ_OPTIONS, convert_options=CONVERT_OPTIONS)
+
+
+def read_month(zip_paths: List[str]) -> dict:
+    """Liest alle ZIPs eines Monats (Monats- oder Tagesdateien) und gibt die benötigten Spalten als Arrays zurück"""
+    table = pa.concat_tables([read_zip(p) for p in zip_paths])
+    # Zeitstempel umwandeln: Epoch-ms direkt als datetime64[ms] uminterpretieren
+    dates = table.column('open_time').to_numpy().view('datetime64[ms]')
     # Nur benötigte Spalten und Reihenfolge
-    df_out = df[['date', 'open', 'high', 'low', 'close', 'volume']].copy()
-    df_out.rename(columns={'volume': 'volume eth'}, inplace=True)
-    all_data.append(df_out)
+    return {
+        'date': dates,
+        'open': table.column('open').to_numpy(),
+        'high': table.column('high').to_numpy(),
+        'low': table.column('low').to_numpy(),
+        'close': table.column('close').to_numpy(),
+        'volume eth': table.column('volume').to_numpy(),
+    }
+
+
+def extract_month(zip_path: str) -> str:
+    """Entpackt die Monats-CSV blockweise nach DATA_DIR und gibt den Pfad zurück"""
+    with zipfile.ZipFile(zip_path) as z:
+        name = z.namelist()[0]
+        csv_path = os.path.join(DATA_DIR, name)
+        if not os.path.exists(csv_path):
+            with z.open(name) as src, open(csv_path + ".part", "wb") as dst:
+                shutil.copyfileobj(src, dst, length=1 << 20)
+            os.replace(csv_path + ".part", csv_path)
+    return csv_path
+
+
+def open_csv_output(path: str):
+    """Öffnet die Ziel-CSV zum Schreiben, bei .gz mit schneller Kompressionsstufe"""
+    if not path.endswith(".gz"):
+        return open(path, "wb")
+    if igzip_threaded is not None:
+        return igzip_threaded.open(path, "wb", compresslevel=1, threads=4)
+    return gzip.open(path, "wb", compresslevel=1)
+
+
+def concat_months(tasks: list, months: list) -> Tuple[dict, dict]:
+    """Fügt gelesene Monate spaltenweise zusammen und liefert die Zeilenanzahlen"""
+    # Monatsdateien sind bereits sortiert und überschneiden sich nicht
+    out = {k: np.concatenate([m[k] for m in months]) for k in OUT_COLS}
+    rowcounts = {ym: len(m['date']) for (ym, _), m in zip(tasks, months)}
+    return out, rowcounts
+
+
+def read_concat(tasks: list) -> Tuple[dict, dict]:
+    """Liest alle Monate im Thread-Pool, fügt sie spaltenweise zusammen und liefert die Zeilenanzahlen"""
+    # Die Reihenfolge der Monate bleibt durch map erhalten
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        months = list(pool.map(lambda t: read_month(t[1]), tasks))
+    return concat_months(tasks, months)
+
+
+def read_prealloc(tasks: list, rowcounts: dict) -> Tuple[dict, dict]:
+    """Füllt vorab allokierte Arrays anhand der gecachten Zeilenanzahlen; ist der Cache veraltet,
+    werden die bereits gelesenen Monate zusammengefügt statt alles erneut zu parsen"""
+    offsets = np.cumsum([0] + [rowcounts[ym] for ym, _ in tasks])
+    total = int(offsets[-1])
+    out = {k: np.empty(total, dtype=dt) for k, dt in OUT_DTYPES.items()}
+    mismatched = {}  # Index -> Monatsdaten, deren Zeilenanzahl nicht zum Cache passt
+
+    def fill(i: int):
+        ym, zip_paths = tasks[i]
+        month = read_month(zip_paths)
+        n = len(month['date'])
+        if n != rowcounts[ym]:
+            mismatched[i] = month
+            return
+        start = offsets[i]
+        for k in OUT_COLS:
+            out[k][start:start + n] = month[k]
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        list(pool.map(fill, range(len(tasks))))
+    if not mismatched:
+        return out, rowcounts
+    # Passende Monate liegen schon in out und werden nur als Views wiederverwendet
+    months = [mismatched[i] if i in mismatched else {k: out[k][offsets[i]:offsets[i + 1]] for k in OUT_COLS}
+              for i in range(len(tasks))]
+    return concat_months(tasks, months)
+
+
+files = {m: month_files(m) for m in MONTHS}
+
+# Downloads parallel über eine gemeinsame Session (Keep-Alive, ein TLS-Handshake pro Verbindung)
+with requests.Session() as session:
+    adapter = HTTPAdapter(pool_connections=12, pool_maxsize=POOL_SIZE, max_retries=3)
+    session.mount("https://", adapter)
+    # Ein Fortschrittsbalken statt einzelner Ausgaben pro Datei aus den Worker-Threads
+    total_files = sum(len(f) for f in files.values())
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool, \
+            tqdm(total=total_files, desc="Dateien", smoothing=0, mininterval=0.2) as pbar:
+        futures = {pool.submit(fetch, session, url, path): path for f in files.values() for url, path in f}
+        results = {}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            pbar.update(1)
+
+# Pro Monat die erfolgreich geladenen ZIPs in Datumsreihenfolge
+tasks = []
+for m in MONTHS:
+    zip_paths = [results[path] for _, path in files[m] if results[path] is not None]
+    if zip_paths:
+        tasks.append((f"{YEAR}-{m:02d}", zip_paths))
+
+if EXTRACT_CSV:
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        list(pool.map(extract_month, [p for _, zip_paths in tasks for p in zip_paths]))
+
+# Zeilenanzahl pro Monat aus dem letzten Lauf: Zielarrays einmal allokieren und direkt befüllen
+rowcounts = {}
+if os.path.exists(ROWCOUNTS_FILE):
+    with open(ROWCOUNTS_FILE, 'r', encoding='utf-8') as f:
+        rowcounts = json.load(f)
+if tasks and all(ym in rowcounts for ym, _ in tasks):
+    out, new_rowcounts = read_prealloc(tasks, rowcounts)
+else:
+    out, new_rowcounts = read_concat(tasks)
+if new_rowcounts is not rowcounts:
+    rowcounts = new_rowcounts
+    with open(ROWCOUNTS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(rowcounts, f, indent=2)
+# Fingerprint der Spaltendaten: unveränderte Daten müssen nicht neu serialisiert werden
+h = hashlib.blake2b(digest_size=16)
+for k in OUT_COLS:
+    h.update(out[k].tobytes())
+sig = h.hexdigest()
+if all(os.path.exists(p) for p in (CSV_FILE, PARQUET_FILE, NPY_FILE, SIG_FILE)):
+    with open(SIG_FILE, 'r', encoding='utf-8') as f:
+        if f.read().strip() == sig:
+            print(f"Daten unverändert, {CSV_FILE} ist aktuell.")
+            sys.exit(0)
 
-# Alle Monate zusammenführen
-final = pd.concat(all_data)
-final = final.sort_values('date').reset_index(drop=True)
+# Arrow-Tabelle direkt auf den Spalten-Arrays (ohne Kopie, kein zwischengeschalteter DataFrame)
+table = pa.table({k: out[k] for k in OUT_COLS})
 
-# Speichern im gewünschten Format
-final.to_csv(OUT_FILE, index=False)
-print(f"Fertig! Datei gespeichert unter: {OUT_FILE}") 
\ No newline at end of file
+# Speichern als Parquet (spaltenweise, deutlich kleiner und schneller wieder einzulesen)
+pq.write_table(table, PARQUET_FILE, compression='snappy')
+# Strukturiertes Array für numpy-Konsumenten
+rec = np.empty(len(out['date']), dtype=NPY_DTYPE)
+for k, field in zip(OUT_COLS, NPY_DTYPE.names):
+    rec[field] = out[k]
+np.save(NPY_FILE, rec)
+# CSV im gewünschten Format für externe Tools weiterhin erzeugen, blockweise von Arrow geschrieben.
+# Kerzen liegen auf vollen Minuten, Sekundenauflösung ergibt dasselbe Datumsformat wie bisher.
+csv_table = table.set_column(0, 'date', pa.array(out['date'].astype('datetime64[s]')))
+with open_csv_output(CSV_FILE) as f:
+    f.write((','.join(OUT_COLS) + '\n').encode('utf-8'))
+    pacsv.write_csv(csv_table, f, pacsv.WriteOptions(include_header=False, batch_size=100_000, quoting_style='none'))
+with open(SIG_FILE, 'w', encoding='utf-8') as f:
+    f.write(sig)
+print(f"Fertig! Datei gespeichert unter: {CSV_FILE}, {PARQUET_FILE} und {NPY_FILE}")
@@ -1,20 +1,402 @@
 import pandas as pd
 import numpy as np
 import json
+import orjson
 import time
 import logging
 from datetime import datetime, timedelta
 import requests
-from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, Dict, List, Optional, Tuple
 import os
-import random
-import ta
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import weakref
 import traceback
 import sys
-from flask import Flask, request, jsonify
+import string
+import asyncio
+import aiohttp
+import math
+from collections import deque
+from itertools import islice
+from functools import lru_cache
+from aiohttp import web
 import openpyxl
 import pytz
+import _grid_sim
+import _indicators
+
+# Feste Telegram-Vorlagen für /status, beim Import zu f-String-Funktionen kompiliert (_fmt_status_*)
+_STATUS_HEADER = (
+    "\U0001F4CA <b>Bot Status</b>\n\n"
+    "\U0001F501 Live Trading: {live}\n"
+    "\U0001F4B0 Accountbalance: <b>{balance:.2f} USDT</b>\n"
+    "\U0001F4C8 Gewinn/Verlust: <b>{pnl_sum:+.2f} USDT</b> ({pnl_pct:+.2f}%)\n"
+    "\U0001F4C2 Offene Positionen: <b>{num_positions}</b>\n"
+    "\U0001F4BC Wert offene Positionen: <b>{value_positions:.2f} USDT</b>\n"
+    "\U0001F512 Gebundene Margin: <b>{margin_sum:.2f} USDT</b>\n"
+    "\U0001F4CA Unrealized PnL: <b>{unrealized_pnl:+.2f} USDT</b>\n"
+    "\U0001F4DD Modus: <b>{mode}</b>\n"
+)
+_STATUS_PRICE = "\U0001F4B1 Aktueller Preis: <b>{price:.2f} USDT</b>\n\n"
+_STATUS_POS_ROW = (
+    "\n{emoji} <b>Position {i}</b> | Einstieg: {entry:.2f} | Größe: {size:.6f} | Hebel: {lev}x\n"
+    "TP: {tp:.2f} ({dist_tp:+.2f} USDT, {pct_tp:+.2f}%) | SL: {sl:.2f} ({dist_sl:+.2f} USDT, {pct_sl:+.2f}%) | "
+    "Liq: {liq:.2f} ({dist_liq:+.2f} USDT, {pct_liq:+.2f}%)\n"
+    "Unrealized PnL: {upnl:+.2f} USDT\n"
+)
+_STATUS_FOOTER = "\n⏰ Letzter Trade: {last_trade:%H:%M:%S}\n"
+_SIDE_EMOJI = ('🔴', '🟢')
+
+# Nur pro Request setzen: ein Session-Header würde den multipart-Upload in send_excel_via_telegram überschreiben
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+# Funding alle 8 Stunden = alle 480 1m-Bars im Backtest
+_FUNDING_EVERY_BARS = 480
+
+
+def _compile_formatter(name: str, template: str, row_fields: Tuple[str, ...] = ()):
+    """Baut aus einer format-Vorlage einmalig eine f-String-Funktion (exec), mit row_fields für alle Zeilen auf einmal"""
+    fstring = 'f' + repr(template)
+    if row_fields:
+        src = f"def {name}(rows):\n    return ''.join([{fstring} for {', '.join(row_fields)} in rows])\n"
+    else:
+        fields = dict.fromkeys(f for _, f, _, _ in string.Formatter().parse(template) if f)
+        src = f"def {name}({', '.join(fields)}):\n    return {fstring}\n"
+    namespace = {}
+    exec(src, namespace)
+    return namespace[name]
+
+
+_fmt_status_header = _compile_formatter('_fmt_status_header', _STATUS_HEADER)
+_fmt_status_price = _compile_formatter('_fmt_status_price', _STATUS_PRICE)
+_fmt_status_rows = _compile_formatter('_fmt_status_rows', _STATUS_POS_ROW, (
+    'emoji', 'i', 'entry', 'size', 'lev', 'tp', 'dist_tp', 'pct_tp', 'sl', 'dist_sl', 'pct_sl',
+    'liq', 'dist_liq', 'pct_liq', 'upnl'))
+_fmt_status_footer = _compile_formatter('_fmt_status_footer', _STATUS_FOOTER)
+
+# Backtest-Meldungen (Start, Fortschritt, Ende), ebenfalls einmalig zu f-String-Funktionen kompiliert
+_BACKTEST_START = """
+🚀 <b>Pionex Grid Bot Backtest gestartet!</b>
+
+📊 <b>Konfiguration:</b>
+• Mode: {mode}
+• Leverage: {leverage}x
+• Grid Count: {grid_count}
+• Investment: ${investment:,.0f}
+• Initial Balance: ${initial_balance:,.0f}
+
+⚙️ <b>Optimierungen aktiv:</b>
+• Dynamische Hebelwirkung
+• Adaptive Grid-Preise
+• Erweitertes Risikomanagement
+• Trend-Filterung
+        """
+_BACKTEST_PROGRESS = """
+        📈 <b>Backtest Fortschritt: {progress:.0f}%</b>
+
+        💰 <b>Aktueller Status:</b>
+        Balance: ${balance:,.2f}
+        PnL: ${pnl:,.2f} ({pnl_pct:.2f}%)
+        Trades: {trades}
+        Laufzeit: {elapsed:.1f}s
+                        """
+_BACKTEST_END = """
+✅ <b>Backtest abgeschlossen!</b>
+
+📊 <b>Endergebnis:</b>
+Start: ${initial_balance:,.2f}
+Ende: ${final_balance:,.2f}
+Rendite: {total_return:.2f}%
+PnL: ${pnl:,.2f}
+
+🎯 <b>Trading-Statistiken:</b>
+Trades: {total_trades}
+Gewinnrate: {win_rate:.1f}%
+Liquidierungen: {liquidated}
+Max Drawdown: {max_drawdown:.2f}%
+
+⏱️ Laufzeit: {runtime:.1f} Sekunden
+        """
+_fmt_backtest_start = _compile_formatter('_fmt_backtest_start', _BACKTEST_START)
+_fmt_backtest_progress = _compile_formatter('_fmt_backtest_progress', _BACKTEST_PROGRESS)
+_fmt_backtest_end = _compile_formatter('_fmt_backtest_end', _BACKTEST_END)
+
+_HELP_MSG = """\
+Pionex Futures Grid Bot - Hilfe
+
+Grundbefehle:
+/start - Bot starten
+/stop - Bot stoppen
+/status - Aktueller Status
+/statustag - Tagesperformance
+/statuswoche - Wochenperformance
+/restart - Bot neu starten
+
+Informationen:
+/balance - Kontostand
+/positions - Offene Positionen
+/trades - Letzte Trades
+/config - Konfiguration
+/liquidate.preview - Vorschau bei sofortigem Schließen
+/export.performance - Exportiert alle Trades als Excel-Datei und sendet sie per Telegram
+
+Modus-Steuerung:
+/mode.auto - Auto-Modus (Bot entscheidet Long/Short nach Trend)
+/mode.long - Nur Long-Trades
+/mode.short - Nur Short-Trades
+
+Debugging:
+/debug.on - Debug aktivieren
+/logs.recent - Letzte Logs
+/debug.info - System-Info
+/reset.stats - Setzt alle Statistiken zurück (z.B. nach Bot-Neustart)
+/reporting.normal - Normales Reporting (nur Trades)
+/reporting.detailliert - Detailliertes Reporting (Grid-Infos bei jedem Kurscheck)
+/version - Zeigt das Datum des letzten Bot-Updates (Codeänderung)
+/set <Nummer>:<Wert> - Setzt einen Parameter live, z.B. /set 21:0
+/paraminfo - Zeigt alle konfigurierbaren Parameter mit Erklärung
+
+Parameter-Nummern und Erklärungen erhältst du mit /paraminfo.
+"""
+# Mapping für Punkt- und Unterstrich-Befehle
+_CMD_ALIASES = {
+    '/reset.stats': '/reset_stats',
+    '/reporting.normal': '/reporting_normal',
+    '/reporting.detailliert': '/reporting_detailliert',
+    '/liquidate.preview': '/liquidate_preview',
+    '/close.preview': '/close_preview',
+    '/debug.on': '/debug on',
+    '/logs.recent': '/logs recent',
+    '/debug.info': '/debug info',
+}
+_MODE_MESSAGES = {
+    'auto': '🔄 Modus auf AUTO gestellt. Der Bot entscheidet automatisch Long/Short nach Trend.',
+    'long': '🔄 Modus auf LONG gestellt. Es werden nur Long-Trades ausgeführt.',
+    'short': '🔄 Modus auf SHORT gestellt. Es werden nur Short-Trades ausgeführt.',
+}
+
+def _vol_regime(volatility: float) -> str:
+    """Volatilitäts-Regime: 'low' (< 1%), 'high' (> 5%) oder 'normal' (auch bei NaN)"""
+    if volatility < 0.01:
+        return 'low'
+    if volatility > 0.05:
+        return 'high'
+    return 'normal'
+
+@lru_cache(maxsize=None)
+def _regime_multipliers(vol_regime: str, trend: str) -> Tuple[float, float, float, float]:
+    """Volatilitäts-/Trend-Faktoren (Hebel vol, Hebel trend, Größe vol, Größe trend) - nur 3x3 Regime-Kombinationen, daher gecacht"""
+    if vol_regime == 'low':  # Niedrige Volatilität
+        lev_vol, size_vol = 1.2, 1.3
+    elif vol_regime == 'high':  # Hohe Volatilität
+        lev_vol, size_vol = 0.7, 0.7
+    else:
+        lev_vol, size_vol = 1.0, 1.0
+    if trend == 'bullish':
+        lev_trend, size_trend = 1.1, 1.2
+    elif trend == 'bearish':
+        lev_trend, size_trend = 0.9, 0.8
+    else:
+        lev_trend, size_trend = 1.0, 1.0
+    return lev_vol, lev_trend, size_vol, size_trend
+
+def _last(items, n: int) -> list:
+    """Die letzten n Elemente einer Liste oder deque, ohne die ganze Sammlung zu kopieren"""
+    return list(islice(items, max(0, len(items) - n), None))
+
+def _progress_index(pct: float, n: int) -> int:
+    """Kleinster Index i mit (i / n) * 100 >= pct - derselbe Vergleich wie in der Backtest-Schleife"""
+    if n <= 0:
+        return 0
+    i = max(0, math.ceil(pct * n / 100))
+    while i > 0 and ((i - 1) / n) * 100 >= pct:
+        i -= 1
+    while (i / n) * 100 < pct:
+        i += 1
+    return i
+
+# Vorab geladene Kursdaten (prices= im Konstruktor), z.B. einmal vom Optimizer geladen und per Shared Memory geteilt
+PRICE_DTYPE = np.dtype([
+    ('timestamp', 'M8[ns]'), ('open', 'f4'), ('high', 'f4'), ('low', 'f4'), ('close', 'f4'), ('volume', 'f4'),
+])
+
+def read_price_csv(path: str) -> pd.DataFrame:
+    """Kurs-CSV (Semikolon, Dezimalkomma) einlesen: timestamp + OHLCV als float32, nach Zeit sortiert"""
+    price_cols = ['open', 'high', 'low', 'close', 'volume']
+    read_kwargs = dict(
+        sep=';', decimal=',',
+        dtype={c: 'float32' for c in price_cols},
+        usecols=['timestamp'] + price_cols,
+        parse_dates=['timestamp'],
+    )
+    # Typisiert mit pyarrow; ohne pyarrow bzw. bei abweichenden Spaltennamen: C-Parser
+    try:
+        data = pd.read_csv(path, engine='pyarrow', **read_kwargs)
+    except (ImportError, ValueError):
+        try:
+            data = pd.read_csv(path, **read_kwargs)
+        except ValueError:
+            data = pd.read_csv(path, sep=';', decimal=',')
+    
+    # Standardize column names
+    data.columns = [col.lower().strip() for col in data.columns]
+    
+    # Ensure required columns exist
+    for col in ['timestamp'] + price_cols:
+        if col not in data.columns:
+            raise ValueError(f"Missing required column: {col}")
+    data[price_cols] = data[price_cols].astype('float32')
+    
+    # Convert timestamp (nur nötig, wenn parse_dates nicht gegriffen hat; festes Format statt Format-Erkennung)
+    if not pd.api.types.is_datetime64_any_dtype(data['timestamp']):
+        try:
+            data['timestamp'] = pd.to_datetime(data['timestamp'], format='%Y-%m-%d %H:%M:%S', cache=True)
+        except ValueError:
+            data['timestamp'] = pd.to_datetime(data['timestamp'], cache=True)
+    
+    # Sort by timestamp
+    return data.sort_values('timestamp').reset_index(drop=True)
+
+def price_records(data: pd.DataFrame) -> np.ndarray:
+    """Frame aus read_price_csv als PRICE_DTYPE-Array (eine zusammenhängende Zeile pro Kerze)"""
+    records = np.empty(len(data), dtype=PRICE_DTYPE)
+    for name in PRICE_DTYPE.names:
+        records[name] = data[name].to_numpy(dtype=PRICE_DTYPE[name])
+    return records
+
+def _tail_lines(path: str, n: int, filter_substr: Optional[str] = None, block: int = 8192) -> List[str]:
+    """Letzte n Zeilen (optional nur mit filter_substr) blockweise vom Dateiende lesen, älteste zuerst"""
+    needle = filter_substr.encode('utf-8') if filter_substr else None
+    found = []
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b''
+        skip_trailing = True  # Leerstück hinter dem letzten Zeilenumbruch ist keine Zeile
+        done = False
+        while len(found) < n and not done:
+            if pos == 0:
+                candidates = [rest]  # Dateianfang erreicht: Rest ist die erste Zeile
+                done = True
+            else:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                pieces = (f.read(step) + rest).split(b'\n')
+                rest = pieces[0]  # evtl. unvollständig, kommt zum nächsten Block
+                candidates = pieces[1:]
+            for line in reversed(candidates):
+                if skip_trailing:
+                    skip_trailing = False
+                    if not line:
+                        continue
+                if needle is None or needle in line:
+                    found.append(line)
+                    if len(found) == n:
+                        break
+    return [line.decode('utf-8', errors='replace') for line in reversed(found)]
+
+
+# Zeilenlayout der offenen Positionen (ein Record pro Slot, siehe PionexFuturesGridBot._pos_arr)
+_POS_DTYPE = np.dtype([
+    ('id', np.int64), ('size', np.float64), ('entry', np.float64), ('lev', np.float64),
+    ('side_sign', np.int8), ('liq', np.float64), ('buy_fee', np.float64), ('grid_id', np.int32),
+])
+
+
+
+# Alle lebenden Bots (schwach referenziert): ihre Telegram-Queues werden beim Prozessende noch abgearbeitet
+_LIVE_BOTS = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_telegram():
+    for bot in list(_LIVE_BOTS):
+        bot.flush_telegram_messages()
+
+
+def _tg_sender_loop(bot_ref, q: queue.Queue, window: float):
+    """Hintergrund-Worker: fasst innerhalb von `window` Sekunden eintreffende Nachrichten bis ~3500 Zeichen zusammen.
+    Hält den Bot nur über eine weakref; endet bei der Stopp-Marke None (close()) oder wenn der Bot freigegeben wurde."""
+    pending = None
+    stop = False
+    while not stop:
+        item = pending or q.get()
+        pending = None
+        if item is None:
+            q.task_done()
+            return
+        text, plain = item
+        parts = [text]
+        size = len(text)
+        deadline = time.monotonic() + window
+        while size < 3500:
+            try:
+                nxt = q.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if nxt is None:
+                q.task_done()
+                stop = True
+                break
+            if nxt[1] != plain or size + len(nxt[0]) + 2 > 3500:
+                pending = nxt  # passt nicht mehr / anderer parse_mode: nächster Durchlauf
+                break
+            parts.append(nxt[0])
+            size += len(nxt[0]) + 2
+        message = '\n\n'.join(parts)
+        bot = bot_ref()
+        if bot is None:
+            stop = True
+        else:
+            for _ in range(3):
+                # Nach Fehlern exponentiell warten; bei 429 (Rate-Limit) dieselbe Nachricht erneut senden
+                wait = bot._telegram_next_send_ts - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                if bot._post_telegram(message, plain) != 429:
+                    break
+            del bot
+        for _ in parts:
+            q.task_done()
+
+class _Trades:
+    """Geschlossene Trades als parallele NumPy-Spalten (SoA), Kapazität wächst geometrisch"""
+    
+    def __init__(self, cap: int = 1024):
+        self.n = 0
+        self.wins = 0  # Anzahl Trades mit pnl > 0, beim Anhängen mitgezählt
+        self.ts = np.empty(cap, dtype='datetime64[s]')
+        self.pnl = np.empty(cap)
+        self.fee = np.empty(cap)
+        self.price = np.empty(cap)
+        self.side = np.empty(cap, dtype=np.int8)  # +1 = buy, -1 = sell
+    
+    def __len__(self):
+        return self.n
+    
+    def append(self, trade: dict):
+        n = self.n
+        if n == len(self.ts):
+            for name in ('ts', 'pnl', 'fee', 'price', 'side'):
+                a = getattr(self, name)
+                setattr(self, name, np.concatenate([a, np.empty_like(a)]))
+        self.ts[n] = np.datetime64(trade['timestamp'], 's')
+        self.pnl[n] = trade['pnl']
+        self.fee[n] = trade.get('fee', 0.0)
+        self.price[n] = trade['price']
+        self.side[n] = 1 if trade['side'] == 'buy' else -1
+        if trade['pnl'] > 0:
+            self.wins += 1
+        self.n = n + 1
+    
+    def index_since(self, start) -> int:
+        """Erster Index mit Zeitstempel >= start (datetime oder datetime64, Binärsuche)"""
+        return int(np.searchsorted(self.ts[:self.n], np.datetime64(start, 's')))
+
 
 class PionexFuturesGridBot:
     """
@@ -53,24 +435,70 @@ class PionexFuturesGridBot:
         25: ("grid_size", "Gridspacing (USDT)"),
     }
     
-    def __init__(self, config_file: str = "pionex_config.json"):
-        self.config = self.load_config(config_file)
+    def __init__(self, config_file: str = "pionex_config.json", config: Optional[Dict] = None,
+                 prices: Optional[np.ndarray] = None):
+        # config: fertiges Config-Dict (z.B. vom Optimizer) statt Datei, wird kopiert und wie die Datei validiert
+        self.config = self.load_config(config_file) if config is None else self.validate_config(dict(config))
+        # prices: Kursdaten als PRICE_DTYPE-Array statt data_file einlesen
+        self._prices = prices
         self.ensure_config_defaults()
         self.setup_logging()
         
         # Initialize Telegram bot state BEFORE setup_telegram
         self.telegram_bot_running = False
         self.telegram_thread = None
-        self.authorized_users = [self.config['telegram_chat_id']]  # Add more users if needed
+        # Weitere User über "authorized_users" in der Config freischalten
+        self.authorized_users = frozenset(
+            str(u) for u in self.config.get('authorized_users', [self.config['telegram_chat_id']])
+        )
         self.debug_mode = False
-        self.debug_logs = []
+        self.debug_logs = deque(maxlen=self.config['debug_log_cap'])  # Nur die neuesten Einträge behalten
+        self._offset_file = 'telegram_offset.txt'  # Letzter bestätigter Update-Offset (Polling)
+        # Befehl -> Handler, einmalig aufgebaut (Befehle sind bereits über cmd_map normalisiert)
+        self._cmd_table = {
+            '/all': self.cmd_all,
+            '/start': self.cmd_start,
+            '/stop': self.cmd_stop,
+            '/status': self.cmd_status,
+            '/statustag': self.cmd_status_tag,
+            '/statuswoche': self.cmd_status_woche,
+            '/balance': self.cmd_balance,
+            '/positions': self.cmd_positions,
+            '/trades': self.cmd_trades,
+            '/config': self.cmd_config,
+            '/restart': self.cmd_restart,
+            '/debug': self.cmd_debug,
+            '/logs': self.cmd_logs,
+            '/help': self.cmd_help,
+            '/liquidate_preview': self.cmd_liquidate_preview,
+            '/close_preview': self.cmd_liquidate_preview,
+            '/reset_stats': self.cmd_reset_stats,
+            '/reporting_normal': lambda chat_id: self.cmd_reporting(chat_id, ['normal']),
+            '/reporting_detailliert': lambda chat_id: self.cmd_reporting(chat_id, ['detailliert']),
+            '/version': self.cmd_version,
+            '/set': self.cmd_set,
+            '/paraminfo': self.cmd_paraminfo,
+            '/export.performance': self.cmd_export_performance,
+            '/mode': self.cmd_mode,
+            '/mode.auto': lambda chat_id: self.cmd_mode(chat_id, ['auto']),
+            '/mode.long': lambda chat_id: self.cmd_mode(chat_id, ['long']),
+            '/mode.short': lambda chat_id: self.cmd_mode(chat_id, ['short']),
+        }
+        self._cmd_with_args = frozenset({'/debug', '/logs', '/set', '/mode'})
         
         self.setup_telegram()
         self.setup_binance_api()
         
         # Trading state
-        self.positions = []  # List of open positions
-        self.trades = []  # List of closed trades
+        self.positions = []  # List of open positions (Reihenfolge = Slot in _pos_arr)
+        self.trades = deque(maxlen=self.config['trade_history_cap'])  # Closed trades (lesbare Dicts für Export/Listen)
+        self._trades = _Trades()  # Dieselben Trades als NumPy-Spalten für Auswertungen
+        # Offene Positionen als NumPy-Structured-Array (_POS_DTYPE) für vektorisierte Auswertungen
+        self._pos_arr = np.zeros(64, dtype=_POS_DTYPE)
+        self._pos_count = 0
+        self._pos_index = {}  # Positions-ID -> Slot
+        self._notional = 0.0  # Laufende Summe size * entry_price aller offenen Positionen (Funding)
+        self._next_pos_id = 1
         self.total_pnl = 0.0
         self.total_fees = 0.0
         self.funding_fees = 0.0
@@ -85,6 +513,8 @@ class PionexFuturesGridBot:
         
         # Grid state
         self.grid_orders = []
+        self.grid_prices = []
+        self._precompute_grid(self.grid_prices)
         self.last_funding_time = None
         
         # Live trading state
@@ -93,6 +523,12 @@ class PionexFuturesGridBot:
         self.current_price = None
         self.last_trade_time = None
         
+        # Fenster für die Volatilitätsspalte (vol_roll), muss vor load_data feststehen
+        self.volatility_lookback = 24  # Stunden für Volatilitätsberechnung
+        self._cols = {}  # Spalten-Cache für detect_trend
+        self._cols_src = None
+        self._grid_range_cache_key = None  # Eingaben der letzten auto_set_grid_range-Berechnung
+        
         # Load historical data for backtest mode only if not live trading
         if not self.config.get('live_trading_enabled', True):  # Default to True for live trading
             self.data = self.load_data()
@@ -107,9 +543,11 @@ class PionexFuturesGridBot:
         self.api_latency = 0.2       # 200ms API-Latenz (erhöht)
         self.min_liquidity = 50000   # Mindest-Liquidität in USD (erhöht)
         self.max_position_size = 0.01  # Max 1% des Kapitals pro Position (reduziert)
+        self._rng = np.random.default_rng(self.config['random_seed'])  # Fester Seed = reproduzierbare Backtests
+        self._rand = np.empty(0)  # Vorgezogene Slippage-Multiplikatoren, siehe _next_rand
+        self._rand_pos = 0
         
         # Erweiterte Optimierungen
-        self.volatility_lookback = 24  # Stunden für Volatilitätsberechnung
         self.trend_strength_threshold = 0.6  # Trend-Filter
         self.dynamic_leverage_enabled = True
         self.adaptive_grid_enabled = True
@@ -143,6 +581,13 @@ class PionexFuturesGridBot:
             "live_trading_enabled": False,
             "grid_mode": "auto",
             "grid_size": None,
+            "backtest_engine": "python",  # "numba": kompilierter Backtest-Kern (_grid_sim)
+            "debug_log_cap": 500,  # Maximale Anzahl gespeicherter Debug-Logs
+            "random_seed": None,  # Seed für die Slippage-Zufallszahlen (None = zufällig)
+            "telegram_coalesce_window": 0.5,  # Sekunden, in denen der Sender weitere Nachrichten sammelt
+            "trade_history_cap": None,  # Maximale Anzahl Trade-Dicts in self.trades (None = unbegrenzt)
+            "backtest_notifications": "batched",  # "log": Backtest-Meldungen nur ins Logfile
+            "backtest_price_dtype": "float64",  # "float32": Schlusskurse halb so groß (Kurse gerundet, Konten bleiben float64)
         }
         for k, v in defaults.items():
             if k not in self.config:
@@ -152,20 +597,7 @@ class PionexFuturesGridBot:
         """Load configuration from JSON file"""
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            # Validate required fields
-            required_fields = [
-                'initial_balance', 'leverage', 'grid_lower_price', 'grid_upper_price',
-                'grid_count', 'investment_amount', 'mode', 'fee_rate',
-                'data_file', 'telegram_token', 'telegram_chat_id'
-            ]
-            
-            for field in required_fields:
-                if field not in config:
-                    raise ValueError(f"Missing required config field: {field}")
-            
-            return config
+                return self.validate_config(json.load(f))
             
         except FileNotFoundError:
             # Create default config
@@ -210,6 +642,20 @@ class PionexFuturesGridBot:
             print(f"Created default config file: {config_file}")
             return default_config
     
+    def validate_config(self, config: Dict) -> Dict:
+        """Validate required fields"""
+        required_fields = [
+            'initial_balance', 'leverage', 'grid_lower_price', 'grid_upper_price',
+            'grid_count', 'investment_amount', 'mode', 'fee_rate',
+            'data_file', 'telegram_token', 'telegram_chat_id'
+        ]
+        
+        for field in required_fields:
+            if field not in config:
+                raise ValueError(f"Missing required config field: {field}")
+        
+        return config
+    
     def setup_logging(self):
         """Setup logging configuration with UTF-8 encoding and no emojis in logs"""
         logging.basicConfig(
@@ -227,6 +673,24 @@ class PionexFuturesGridBot:
         self.telegram_token = self.config['telegram_token']
         self.telegram_chat_id = self.config['telegram_chat_id']
         self.telegram_url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
+        self._getme_url = f"https://api.telegram.org/bot{self.telegram_token}/getMe"
+        self._health_cache = {}  # key -> (monotonic-Zeitpunkt, Ergebnis) für Health-Probes
+        # Eine Session für alle Telegram- und Binance-Aufrufe: Keep-Alive spart den TLS-Handshake pro Request
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(
+            total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])))
+        # Nachrichten laufen über eine Queue; ein Worker-Thread sendet sie (gebündelt) im Hintergrund
+        self._tg_queue = queue.Queue()
+        self.backtest_mode = False  # True während run_backtest: Meldungen landen in _tg_buffer
+        self._tg_buffer = []
+        self._tg_buffer_max = 20
+        self._telegram_fail_streak = 0  # Aufeinanderfolgende Sendefehler (Backoff)
+        self._telegram_next_send_ts = 0.0
+        # Sender-Thread und atexit-Flush halten den Bot nur schwach, damit er (samt Daten) freigegeben werden kann
+        threading.Thread(target=_tg_sender_loop, daemon=True, args=(
+            weakref.ref(self), self._tg_queue, float(self.config.get('telegram_coalesce_window', 0.5)))).start()
+        self._tg_stop = weakref.finalize(self, self._tg_queue.put, None)
+        _LIVE_BOTS.add(self)
         
         # Test Telegram connection first
         if self.test_telegram_connection():
@@ -248,7 +712,7 @@ class PionexFuturesGridBot:
                 'url': f"{self.webhook_url}/webhook",
                 'allowed_updates': ['message']
             }
-            response = requests.post(webhook_setup_url, json=webhook_data, timeout=10)
+            response = self._http.post(webhook_setup_url, json=webhook_data, timeout=10)
             if response.status_code == 200:
                 self.logger.info("Telegram webhook setup successful")
                 self.start_telegram_bot()
@@ -268,26 +732,30 @@ class PionexFuturesGridBot:
         self.logger.info("Telegram bot started")
     
     def run_telegram_bot(self):
-        """Run Telegram bot webhook server"""
-        app = Flask(__name__)
-        
-        @app.route('/webhook', methods=['POST'])
-        def webhook():
+        """Run Telegram bot webhook server (aiohttp, eigener Event-Loop in diesem Thread)"""
+        async def webhook(request):
             try:
-                data = request.get_json()
+                data = orjson.loads(await request.read())
                 if 'message' in data:
-                    self.handle_telegram_message(data['message'])
-                return jsonify({'status': 'ok'})
+                    # Befehle laufen im Thread-Pool, damit der Event-Loop nicht blockiert
+                    asyncio.get_running_loop().run_in_executor(None, self.handle_telegram_message, data['message'])
+                return web.json_response({'status': 'ok'})
             except Exception as e:
                 self.logger.error(f"Webhook error: {e}")
-                return jsonify({'status': 'error'})
+                return web.json_response({'status': 'error'})
         
-        @app.route('/health', methods=['GET'])
-        def health():
-            return jsonify({'status': 'healthy', 'bot_running': self.telegram_bot_running})
+        async def health(request):
+            return web.json_response({'status': 'healthy', 'bot_running': self.telegram_bot_running})
+        
+        app = web.Application()
+        app.router.add_post('/webhook', webhook)
+        app.router.add_get('/health', health)
         
         try:
-            app.run(host='0.0.0.0', port=5000, debug=False)
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            web.run_app(app, host='0.0.0.0', port=5000, access_log=None,
+                        handle_signals=False, print=None, loop=loop)
         except Exception as e:
             self.logger.error(f"Telegram bot server error: {e}")
     
@@ -302,23 +770,40 @@ class PionexFuturesGridBot:
         self.logger.info("Telegram bot started (polling mode)")
     
     def run_telegram_polling(self):
-        """Run Telegram bot with polling"""
+        """Run Telegram bot with polling (aiohttp-Long-Poll auf eigenem Event-Loop in diesem Thread)"""
+        try:
+            asyncio.run(self._poll_updates())
+        except Exception as e:
+            self.logger.error(f"Telegram polling stopped: {e}")
+    
+    async def _poll_updates(self):
+        """getUpdates-Schleife über eine einzige aiohttp-Session"""
         offset = 0
+        # Offset über Neustarts hinweg merken, sonst spielt Telegram alle offenen Updates erneut ab
+        try:
+            with open(self._offset_file, 'r') as f:
+                offset = int(f.read().strip())
+        except (OSError, ValueError):
+            pass
         
-        while self.telegram_bot_running:
-            try:
-                # Get updates from Telegram
-                updates_url = f"https://api.telegram.org/bot{self.telegram_token}/getUpdates"
-                params = {
-                    'offset': offset,
-                    'timeout': 30,
-                    'allowed_updates': ['message']
-                }
-                
-                response = requests.get(updates_url, params=params, timeout=35)
-                
-                if response.status_code == 200:
-                    data = response.json()
+        loop = asyncio.get_running_loop()
+        updates_url = f"https://api.telegram.org/bot{self.telegram_token}/getUpdates"
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=35)) as session:
+            while self.telegram_bot_running:
+                try:
+                    params = {
+                        'offset': offset,
+                        'limit': 100,
+                        'timeout': 30,
+                        'allowed_updates': json.dumps(['message'])  # GET-Parameter muss ein JSON-Array sein
+                    }
+                    
+                    async with session.get(updates_url, params=params) as response:
+                        if response.status != 200:
+                            self.logger.warning(f"Telegram polling failed: {response.status}")
+                            await asyncio.sleep(5)  # Wait before retry
+                            continue
+                        data = orjson.loads(await response.read())
                     
                     if data.get('ok') and data.get('result'):
                         for update in data['result']:
@@ -326,19 +811,22 @@ class PionexFuturesGridBot:
                             
                             if 'message' in update:
                                 try:
-                                    self.handle_telegram_message(update['message'])
+                                    # Befehle blockieren (HTTP, Dateien) - im Thread-Pool, aber in Reihenfolge
+                                    await loop.run_in_executor(None, self.handle_telegram_message, update['message'])
                                 except Exception as e:
                                     self.logger.error(f"Error handling message: {e}")
-                else:
-                    self.logger.warning(f"Telegram polling failed: {response.status_code}")
-                    time.sleep(5)  # Wait before retry
-                    
-            except requests.exceptions.Timeout:
-                # Timeout is normal, continue polling
-                continue
-            except Exception as e:
-                self.logger.error(f"Telegram polling error: {e}")
-                time.sleep(10)  # Wait longer before retry
+                        try:
+                            with open(self._offset_file, 'w') as f:
+                                f.write(str(offset))
+                        except OSError as e:
+                            self.logger.warning(f"Telegram offset could not be saved: {e}")
+                        
+                except asyncio.TimeoutError:
+                    # Timeout is normal, continue polling
+                    continue
+                except Exception as e:
+                    self.logger.error(f"Telegram polling error: {e}")
+                    await asyncio.sleep(10)  # Wait longer before retry
     
     def handle_telegram_message(self, message):
         """Handle incoming Telegram messages"""
@@ -367,162 +855,15 @@ class PionexFuturesGridBot:
             cmd = cmd_parts[0].lower().replace('_', '.').replace('/', '/').strip()
             args = cmd_parts[1:] if len(cmd_parts) > 1 else []
 
-            # Mapping für Punkt- und Unterstrich-Befehle
-            cmd_map = {
-                '/reset.stats': '/reset_stats',
-                '/reporting.normal': '/reporting_normal',
-                '/reporting.detailliert': '/reporting_detailliert',
-                '/set': '/set',
-                '/paraminfo': '/paraminfo',
-                '/export.performance': '/export.performance',
-                '/liquidate.preview': '/liquidate_preview',
-                '/close.preview': '/close_preview',
-                '/debug.on': '/debug on',
-                '/logs.recent': '/logs recent',
-                '/debug.info': '/debug info',
-                '/all': '/all',
-            }
-            if cmd in cmd_map:
-                cmd = cmd_map[cmd]
+            cmd = _CMD_ALIASES.get(cmd, cmd)
 
-            # /all immer ganz oben prüfen
-            if cmd == '/all':
-                self.cmd_all(chat_id)
-                return
-
-            if cmd == '/start':
-                self.cmd_start(chat_id)
-            elif cmd == '/stop':
-                self.cmd_stop(chat_id)
-            elif cmd == '/status':
-                self.cmd_status(chat_id)
-            elif cmd == '/statustag':
-                self.cmd_status_tag(chat_id)
-            elif cmd == '/statuswoche':
-                self.cmd_status_woche(chat_id)
-            elif cmd == '/balance':
-                self.cmd_balance(chat_id)
-            elif cmd == '/positions':
-                self.cmd_positions(chat_id)
-            elif cmd == '/trades':
-                self.cmd_trades(chat_id)
-            elif cmd == '/config':
-                self.cmd_config(chat_id)
-            elif cmd == '/restart':
-                self.cmd_restart(chat_id)
-            elif cmd == '/debug':
-                self.cmd_debug(chat_id, args)
-            elif cmd == '/logs':
-                self.cmd_logs(chat_id, args)
-            elif cmd == '/help':
-                self.cmd_help(chat_id)
-            elif cmd in ['/liquidate_preview', '/close_preview']:
-                self.cmd_liquidate_preview(chat_id)
-            elif cmd == '/reset_stats':
-                self.cmd_reset_stats(chat_id)
-            elif cmd == '/reporting_normal':
-                self.reporting_mode = 'normal'
-                self.send_telegram_message("🔕 Detailliertes Reporting ist jetzt DEAKTIVIERT. Nur noch Benachrichtigungen bei Trades.")
-            elif cmd == '/reporting_detailliert':
-                self.reporting_mode = 'detailliert'
-                self.send_telegram_message("📢 Detailliertes Reporting ist jetzt AKTIV. Bei jedem Kurscheck werden Grid-Infos gesendet.")
-            elif cmd == '/version':
-                self.cmd_version(chat_id)
-            elif cmd == '/set' and args:
-                try:
-                    # Robust: Entferne alle Leerzeichen um Nummer und Wert
-                    num_val = args[0].replace(' ', '')
-                    num, val = num_val.split(':')
-                    num = int(num.strip())
-                    val = val.strip()
-                    if num == 25:
-                        grid_size = float(val)
-                        self.config['grid_size'] = grid_size
-                        self.config['grid_mode'] = 'static'
-                        self.grid_prices = self.calculate_grid_prices()
-                        self.send_telegram_message(f"Gridspacing wurde auf {grid_size} USDT gesetzt. Grid ist jetzt statisch.")
-                        self.send_telegram_message(f"Neues Grid: {self.config['grid_count']} x {grid_size} USDT von {self.config['grid_lower_price']:.2f} bis {self.config['grid_upper_price']:.2f}")
-                        return
-                    elif num == 3:
-                        grid_count = int(val)
-                        self.config['grid_count'] = grid_count
-                        self.grid_prices = self.calculate_grid_prices()
-                        self.send_telegram_message(f"Grid-Anzahl wurde auf {grid_count} gesetzt. Grid wurde neu berechnet.")
-                        self.send_telegram_message(f"Neues Grid: {grid_count} x {self.config.get('grid_size','auto')} USDT von {self.config['grid_lower_price']:.2f} bis {self.config['grid_upper_price']:.2f}")
-                        return
-                    elif num == 24 and val.lower() == 'auto':
-                        self.config['grid_mode'] = 'auto'
-                        self.config['grid_size'] = None
-                        self.grid_prices = self.calculate_grid_prices()
-                        self.send_telegram_message('Grid-Modus wieder auf AUTO gestellt. Grid wird automatisch berechnet.')
-                        return
-                    elif num in self.CONFIG_PARAMS:
-                        key, _ = self.CONFIG_PARAMS[num]
-                        old_val = self.config.get(key, None)
-                        # Typkonvertierung
-                        if isinstance(self.config.get(key, None), bool):
-                            self.config[key] = bool(int(val))
-                        elif isinstance(self.config.get(key, None), int):
-                            self.config[key] = int(val)
-                        elif isinstance(self.config.get(key, None), float):
-                            self.config[key] = float(val)
-                        else:
-                            self.config[key] = val
-                        self.send_telegram_message(f"Parameter {num} ({key}) wurde auf {val} gesetzt.")
-                    else:
-                        self.send_telegram_message(f"Unbekannte Parameternummer: {num}")
-                except Exception as e:
-                    self.send_telegram_message(f"Fehler beim Setzen: {e}")
-                return
-            elif cmd == '/paraminfo':
-                param_msg = "Verfügbare Parameter für /set:\n"
-                for num, (key, desc) in self.CONFIG_PARAMS.items():
-                    param_msg += f"{num}: {key}  // {desc}\n"
-                self.send_telegram_message(param_msg, force_plaintext=True)
-                return
-            elif cmd == '/export.performance':
-                if self.export_performance_to_excel():
-                    if self.send_excel_via_telegram(chat_id):
-                        self.send_telegram_message("Excel-Export wurde gesendet.")
-                    else:
-                        self.send_telegram_message("Fehler beim Senden der Excel-Datei.")
-                else:
-                    self.send_telegram_message("Keine Trades zum Exportieren vorhanden.")
-            elif cmd in ['/mode.auto', '/mode.auto', '/mode', '/mode.auto'] or (cmd == '/mode' and args and args[0].lower() == 'auto'):
-                self.config['mode'] = 'auto'
-                self.send_telegram_message('🔄 Modus auf AUTO gestellt. Der Bot entscheidet automatisch Long/Short nach Trend.')
-                return
-            elif cmd in ['/mode.long', '/mode.long'] or (cmd == '/mode' and args and args[0].lower() == 'long'):
-                self.config['mode'] = 'long'
-                self.send_telegram_message('🔄 Modus auf LONG gestellt. Es werden nur Long-Trades ausgeführt.')
-                return
-            elif cmd in ['/mode.short', '/mode.short'] or (cmd == '/mode' and args and args[0].lower() == 'short'):
-                self.config['mode'] = 'short'
-                self.send_telegram_message('🔄 Modus auf SHORT gestellt. Es werden nur Short-Trades ausgeführt.')
-                return
-            elif cmd == '/set' and args:
-                if args[0].lower().startswith('gridspacing'):
-                    try:
-                        _, val = args[0].split('gridspacing')
-                        val = val.strip(':= ')
-                        grid_size = float(val)
-                        self.config['grid_size'] = grid_size
-                        self.config['grid_mode'] = 'static'
-                        self.grid_prices = self.calculate_grid_prices()
-                        self.send_telegram_message(f"Gridspacing wurde auf {grid_size} USDT gesetzt. Grid ist jetzt statisch.")
-                        self.send_telegram_message(f"Neues Grid: {self.config['grid_count']} x {grid_size} USDT von {self.config['grid_lower_price']:.2f} bis {self.config['grid_upper_price']:.2f}")
-                    except Exception as e:
-                        self.send_telegram_message(f"Fehler beim Setzen von gridspacing: {e}")
-                    return
-                # /set 24:auto schaltet auf Automatik
-                if args[0].startswith('24:') and 'auto' in args[0]:
-                    self.config['grid_mode'] = 'auto'
-                    self.config['grid_size'] = None
-                    self.send_telegram_message('Grid-Modus wieder auf AUTO gestellt. Grid wird automatisch berechnet.')
-                    self.grid_prices = self.calculate_grid_prices()
-                    return
-            else:
+            handler = self._cmd_table.get(cmd)
+            if handler is None:
                 self.send_telegram_message(f"❌ Unbekannter Befehl: {cmd}\nVerwende /help für verfügbare Befehle")
+            elif cmd in self._cmd_with_args:
+                handler(chat_id, args)
+            else:
+                handler(chat_id)
                 
         except Exception as e:
             error_msg = f"❌ Fehler beim Verarbeiten des Befehls: {str(e)}"
@@ -558,65 +899,51 @@ class PionexFuturesGridBot:
     def cmd_status(self, chat_id: str):
         """Status command"""
         try:
-            num_positions = len(self.positions)
-            value_positions = sum([p['size'] * p['entry_price'] for p in self.positions]) if self.positions else 0.0
+            n = self._pos_count
+            arr = self._pos_arr
+            sizes, entries, levs, signs = arr['size'][:n], arr['entry'][:n], arr['lev'][:n], arr['side_sign'][:n]
+            num_positions = n
+            notional = sizes * entries
+            value_positions = float(notional.sum())
             pnl_sum = self.current_balance - self.start_balance
             pnl_pct = (pnl_sum / self.start_balance) * 100 if self.start_balance else 0.0
-            margin_sum = sum([
-                (p['size'] * p['entry_price']) / p['leverage'] if p['leverage'] else 0.0
-                for p in self.positions
-            ])
+            margin_sum = float(np.divide(notional, levs, out=np.zeros(n), where=levs != 0).sum())
             available_balance = self.current_balance - value_positions
             unrealized_pnl = 0.0
-            if self.positions and self.current_price:
-                for p in self.positions:
-                    if p['side'] == 'long':
-                        unrealized_pnl += (self.current_price - p['entry_price']) * p['size'] * p['leverage']
-                    elif p['side'] == 'short':
-                        unrealized_pnl += (p['entry_price'] - self.current_price) * p['size'] * p['leverage']
-
-            status_msg = (
-                f"\U0001F4CA <b>Bot Status</b>\n\n"
-                f"\U0001F501 Live Trading: {'✅ Aktiv' if self.is_live_trading else '❌ Inaktiv'}\n"
-                f"\U0001F4B0 Accountbalance: <b>{self.current_balance:.2f} USDT</b>\n"
-                f"\U0001F4C8 Gewinn/Verlust: <b>{pnl_sum:+.2f} USDT</b> ({pnl_pct:+.2f}%)\n"
-                f"\U0001F4C2 Offene Positionen: <b>{num_positions}</b>\n"
-                f"\U0001F4BC Wert offene Positionen: <b>{value_positions:.2f} USDT</b>\n"
-                f"\U0001F512 Gebundene Margin: <b>{margin_sum:.2f} USDT</b>\n"
-                f"\U0001F4CA Unrealized PnL: <b>{unrealized_pnl:+.2f} USDT</b>\n"
-                f"\U0001F4DD Modus: <b>{self.config.get('mode','long').upper()}</b>\n"
+            if n and self.current_price:
+                upnls = (self.current_price - entries) * signs * sizes * levs
+                unrealized_pnl = float(upnls.sum())
+
+            status_msg = _fmt_status_header(
+                live='✅ Aktiv' if self.is_live_trading else '❌ Inaktiv',
+                balance=self.current_balance,
+                pnl_sum=pnl_sum,
+                pnl_pct=pnl_pct,
+                num_positions=num_positions,
+                value_positions=value_positions,
+                margin_sum=margin_sum,
+                unrealized_pnl=unrealized_pnl,
+                mode=self.config.get('mode', 'long').upper(),
             )
             if self.current_price:
-                status_msg += f"\U0001F4B1 Aktueller Preis: <b>{self.current_price:.2f} USDT</b>\n\n"
-            if self.positions:
+                status_msg += _fmt_status_price(price=self.current_price)
+            if n and self.current_price:
                 status_msg += "<b>Offene Positionen Details:</b>\n"
-                for i, pos in enumerate(self.positions, 1):
-                    side_emoji = '🟢' if pos['side'] == 'long' else '🔴'
-                    entry = pos['entry_price']
-                    size = pos['size']
-                    lev = pos['leverage']
-                    liq = pos['liquidation_price'] if 'liquidation_price' in pos else self.calculate_liquidation_price(entry, size, pos['side']=='long', lev)
-                    tp = entry * (1 + self.config['take_profit_pct']) if pos['side']=='long' else entry * (1 - self.config['take_profit_pct'])
-                    sl = entry * (1 - self.config['stop_loss_pct']) if pos['side']=='long' else entry * (1 + self.config['stop_loss_pct'])
-                    # Abstände
-                    dist_tp = (tp - self.current_price) if pos['side']=='long' else (self.current_price - tp)
-                    dist_sl = (sl - self.current_price) if pos['side']=='long' else (self.current_price - sl)
-                    dist_liq = (liq - self.current_price) if pos['side']=='long' else (self.current_price - liq)
-                    pct_tp = (dist_tp / self.current_price) * 100
-                    pct_sl = (dist_sl / self.current_price) * 100
-                    pct_liq = (dist_liq / self.current_price) * 100
-                    # Unrealized PnL
-                    if pos['side'] == 'long':
-                        upnl = (self.current_price - entry) * size * lev
-                    else:
-                        upnl = (entry - self.current_price) * size * lev
-                    status_msg += (
-                        f"\n{side_emoji} <b>Position {i}</b> | Einstieg: {entry:.2f} | Größe: {size:.6f} | Hebel: {lev}x\n"
-                        f"TP: {tp:.2f} ({dist_tp:+.2f} USDT, {pct_tp:+.2f}%) | SL: {sl:.2f} ({dist_sl:+.2f} USDT, {pct_sl:+.2f}%) | Liq: {liq:.2f} ({dist_liq:+.2f} USDT, {pct_liq:+.2f}%)\n"
-                        f"Unrealized PnL: {upnl:+.2f} USDT\n"
-                    )
+                # TP/SL/Liq und Abstände für alle Positionen in einem Durchgang
+                cur = self.current_price
+                tps = entries * (1 + signs * self.config['take_profit_pct'])
+                sls = entries * (1 - signs * self.config['stop_loss_pct'])
+                liqs = arr['liq'][:n]
+                dist_tps = (tps - cur) * signs
+                dist_sls = (sls - cur) * signs
+                dist_liqs = (liqs - cur) * signs
+                emojis = [_SIDE_EMOJI[int(long)] for long in signs > 0]
+                status_msg += _fmt_status_rows(zip(
+                    emojis, range(1, n + 1), entries, sizes, [pos['leverage'] for pos in self.positions],
+                    tps, dist_tps, dist_tps / cur * 100, sls, dist_sls, dist_sls / cur * 100,
+                    liqs, dist_liqs, dist_liqs / cur * 100, upnls))
             if self.last_trade_time:
-                status_msg += f"\n⏰ Letzter Trade: {self.last_trade_time.strftime('%H:%M:%S')}\n"
+                status_msg += _fmt_status_footer(last_trade=self.last_trade_time)
             self.send_telegram_message(status_msg)
         except Exception as e:
             self.send_telegram_message(f"❌ Fehler beim Status: {str(e)}")
@@ -624,21 +951,20 @@ class PionexFuturesGridBot:
     def cmd_status_tag(self, chat_id: str):
         """Status command für Tagesperformance"""
         try:
-            from datetime import datetime, timedelta
-            
-            # Aktueller Tag (00:00 bis jetzt)
+            # Aktueller Tag (00:00 bis jetzt), Grenze direkt als datetime64
             now = datetime.now()
-            start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            start_of_day = np.datetime64(now, 'D')
             
-            # Filtere Trades für heute
-            today_trades = [t for t in self.trades if 'timestamp' in t and t['timestamp'] >= start_of_day]
-            closed_trades = [t for t in today_trades if 'pnl' in t]
+            # Trades für heute per Binärsuche, Kennzahlen direkt auf den NumPy-Spalten
+            tr = self._trades
+            start = tr.index_since(start_of_day)
+            net = tr.pnl[start:tr.n] - tr.fee[start:tr.n]
             
             # Berechne Tagesperformance
-            total_pnl_today = sum(t['pnl'] - t.get('fee', 0) for t in closed_trades)
-            total_fees_today = sum(t.get('fee', 0) for t in today_trades)
-            num_trades_today = len(closed_trades)
-            win_trades_today = len([t for t in closed_trades if t['pnl'] - t.get('fee', 0) > 0])
+            total_pnl_today = float(net.sum())
+            total_fees_today = float(tr.fee[start:tr.n].sum())
+            num_trades_today = len(net)
+            win_trades_today = int((net > 0).sum())
             win_rate_today = (win_trades_today / num_trades_today * 100) if num_trades_today > 0 else 0
             
             # Balance-Änderung heute
@@ -663,12 +989,13 @@ class PionexFuturesGridBot:
             else:
                 status_msg += "\n• Keine Trades"
 
-            if closed_trades:
+            if num_trades_today:
                 status_msg += "\n\n<b>Heutige Trades:</b>\n"
-                for i, t in enumerate(closed_trades[-5:], 1):  # Letzte 5 Trades
-                    emoji = "🟢" if t['pnl'] - t.get('fee', 0) >= 0 else "🔴"
-                    netto_pnl = t['pnl'] - t.get('fee', 0)
-                    status_msg += f"{emoji} {t['side'].upper()}: {netto_pnl:+.2f} USDT | {t['price']:.2f}\n"
+                for j in range(max(start, tr.n - 5), tr.n):  # Letzte 5 Trades
+                    netto_pnl = tr.pnl[j] - tr.fee[j]
+                    emoji = "🟢" if netto_pnl >= 0 else "🔴"
+                    side = 'BUY' if tr.side[j] > 0 else 'SELL'
+                    status_msg += f"{emoji} {side}: {netto_pnl:+.2f} USDT | {tr.price[j]:.2f}\n"
             
             self.send_telegram_message(status_msg)
         except Exception as e:
@@ -677,39 +1004,33 @@ class PionexFuturesGridBot:
     def cmd_status_woche(self, chat_id: str):
         """Status command für Wochenperformance"""
         try:
-            from datetime import datetime, timedelta
-            
-            # Aktuelle Woche (Montag 00:00 bis jetzt)
+            # Aktuelle Woche (Montag 00:00 bis jetzt), Grenze direkt als datetime64
             now = datetime.now()
-            start_of_week = now - timedelta(days=now.weekday())
-            start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+            start_of_week = np.datetime64(now, 'D') - now.weekday()
             
-            # Filtere Trades für diese Woche
-            week_trades = [t for t in self.trades if 'timestamp' in t and t['timestamp'] >= start_of_week]
-            closed_trades = [t for t in week_trades if 'pnl' in t]
+            # Trades für diese Woche per Binärsuche, Kennzahlen direkt auf den NumPy-Spalten
+            tr = self._trades
+            start = tr.index_since(start_of_week)
+            net = tr.pnl[start:tr.n] - tr.fee[start:tr.n]
             
             # Berechne Wochenperformance
-            total_pnl_week = sum(t['pnl'] - t.get('fee', 0) for t in closed_trades)
-            total_fees_week = sum(t.get('fee', 0) for t in week_trades)
-            num_trades_week = len(closed_trades)
-            win_trades_week = len([t for t in closed_trades if t['pnl'] - t.get('fee', 0) > 0])
+            total_pnl_week = float(net.sum())
+            total_fees_week = float(tr.fee[start:tr.n].sum())
+            num_trades_week = len(net)
+            win_trades_week = int((net > 0).sum())
             win_rate_week = (win_trades_week / num_trades_week * 100) if num_trades_week > 0 else 0
             
             # Balance-Änderung diese Woche
             balance_change_week = total_pnl_week
             balance_change_pct = (balance_change_week / self.start_balance * 100) if self.start_balance > 0 else 0
             
-            # Tagesaufschlüsselung
-            daily_stats = {}
-            for t in closed_trades:
-                day = t['timestamp'].strftime('%d.%m')
-                if day not in daily_stats:
-                    daily_stats[day] = {'pnl': 0, 'trades': 0}
-                daily_stats[day]['pnl'] += t['pnl'] - t.get('fee', 0)
-                daily_stats[day]['trades'] += 1
+            # Tagesaufschlüsselung (chronologisch gruppiert)
+            days, day_idx = np.unique(tr.ts[start:tr.n].astype('datetime64[D]'), return_inverse=True)
+            day_pnl = np.bincount(day_idx, weights=net, minlength=len(days))
+            day_trades = np.bincount(day_idx, minlength=len(days))
             
             status_msg = f"""
-📅 <b>WOCHEPERFORMANCE - KW{now.isocalendar()[1]} ({start_of_week.strftime('%d.%m')} - {now.strftime('%d.%m.%Y')})</b>
+📅 <b>WOCHEPERFORMANCE - KW{now.isocalendar()[1]} ({start_of_week.item():%d.%m} - {now:%d.%m.%Y})</b>
 
 💰 <b>Performance diese Woche:</b>
 • Netto PnL: {total_pnl_week:+.2f} USDT ({balance_change_pct:+.2f}%)
@@ -726,13 +1047,11 @@ class PionexFuturesGridBot:
             else:
                 status_msg += "\n• Keine Trades"
 
-            if daily_stats:
+            if len(days):
                 status_msg += "\n\n<b>Tagesaufschlüsselung:</b>\n"
-                for day in sorted(daily_stats.keys()):
-                    daily_pnl = daily_stats[day]['pnl']
-                    daily_trades = daily_stats[day]['trades']
+                for day, daily_pnl, daily_trades in zip(days, day_pnl, day_trades):
                     emoji = "🟢" if daily_pnl >= 0 else "🔴"
-                    status_msg += f"{emoji} {day}: {daily_pnl:+.2f} USDT ({daily_trades} Trades)\n"
+                    status_msg += f"{emoji} {day.item().strftime('%d.%m')}: {daily_pnl:+.2f} USDT ({daily_trades} Trades)\n"
             
             self.send_telegram_message(status_msg)
         except Exception as e:
@@ -789,7 +1108,7 @@ class PionexFuturesGridBot:
                 return
             
             # Show last 5 trades
-            recent_trades = self.trades[-5:]
+            recent_trades = _last(self.trades, 5)
             trades_msg = f"📊 **Letzte {len(recent_trades)} Trades**\n\n"
             
             for trade in recent_trades:
@@ -849,7 +1168,7 @@ class PionexFuturesGridBot:
                                          "/debug on - Debug-Modus aktivieren\n"
                                          "/debug off - Debug-Modus deaktivieren\n"
                                          "/debug info - System-Informationen\n"
-                                         "/debug test - API-Test")
+                                         "/debug test - API-Test (/debug test fresh ohne Cache)")
                 return
             
             subcmd = args[0].lower()
@@ -870,15 +1189,16 @@ class PionexFuturesGridBot:
                 info_msg += f"Threads: {threading.active_count()}\n"
                 info_msg += f"Speicher: {len(self.debug_logs)} Debug-Logs\n"
                 
-                # Check API connections
+                # Check API connections (beide Abfragen laufen parallel)
+                price_future, telegram_future = self._start_health_probes()
                 try:
-                    price = self.get_live_price()
+                    price = price_future.result()
                     info_msg += f"Binance API: {'✅ Verbunden' if price else '❌ Fehler'}\n"
                 except:
                     info_msg += "Binance API: ❌ Fehler\n"
                 
                 try:
-                    response = requests.get(self.telegram_url.replace('/sendMessage', '/getMe'), timeout=5)
+                    response = telegram_future.result()
                     info_msg += f"Telegram API: {'✅ Verbunden' if response.status_code == 200 else '❌ Fehler'}\n"
                 except:
                     info_msg += "Telegram API: ❌ Fehler\n"
@@ -887,17 +1207,19 @@ class PionexFuturesGridBot:
                 
             elif subcmd == 'test':
                 test_msg = "🧪 **API-Tests**\n\n"
+                use_cache = not (len(args) > 1 and args[1].lower() == 'fresh')  # /debug test fresh erzwingt neue Abfragen
+                price_future, telegram_future = self._start_health_probes(use_cache)
                 
                 # Test Binance API
                 try:
-                    price = self.get_live_price()
+                    price = price_future.result()
                     test_msg += f"Binance Preis: {price:.2f} USDT ✅\n"
                 except Exception as e:
                     test_msg += f"Binance API: ❌ {str(e)}\n"
                 
                 # Test Telegram API
                 try:
-                    response = requests.get(self.telegram_url.replace('/sendMessage', '/getMe'), timeout=5)
+                    response = telegram_future.result()
                     if response.status_code == 200:
                         test_msg += "Telegram API: ✅ Verbunden\n"
                     else:
@@ -927,13 +1249,11 @@ class PionexFuturesGridBot:
             
             if subcmd == 'recent':
                 try:
-                    with open('pionex_futures_bot.log', 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        recent_lines = lines[-20:]  # Last 20 lines
-                        log_msg = "📋 **Letzte Logs:**\n\n"
-                        for line in recent_lines:
-                            log_msg += f"`{line.strip()}`\n"
-                        self.send_telegram_message(log_msg)
+                    recent_lines = _tail_lines('pionex_futures_bot.log', 20)  # Last 20 lines
+                    log_msg = "📋 **Letzte Logs:**\n\n"
+                    for line in recent_lines:
+                        log_msg += f"`{line.strip()}`\n"
+                    self.send_telegram_message(log_msg)
                 except Exception as e:
                     self.send_telegram_message(f"❌ Log-Fehler: {str(e)}")
                     
@@ -943,22 +1263,20 @@ class PionexFuturesGridBot:
                     return
                 
                 debug_msg = "🔧 **Debug-Logs:**\n\n"
-                for i, log in enumerate(self.debug_logs[-10:], 1):  # Last 10 debug logs
+                for i, log in enumerate(_last(self.debug_logs, 10), 1):  # Last 10 debug logs
                     debug_msg += f"**{i}:** {log[:100]}...\n\n"
                 self.send_telegram_message(debug_msg)
                 
             elif subcmd == 'error':
                 try:
-                    with open('pionex_futures_bot.log', 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        error_lines = [line for line in lines if 'ERROR' in line][-10:]  # Last 10 errors
-                        if error_lines:
-                            error_msg = "❌ **Letzte Fehler:**\n\n"
-                            for line in error_lines:
-                                error_msg += f"`{line.strip()}`\n"
-                            self.send_telegram_message(error_msg)
-                        else:
-                            self.send_telegram_message("✅ Keine Fehler in den Logs")
+                    error_lines = _tail_lines('pionex_futures_bot.log', 10, filter_substr='ERROR')  # Last 10 errors
+                    if error_lines:
+                        error_msg = "❌ **Letzte Fehler:**\n\n"
+                        for line in error_lines:
+                            error_msg += f"`{line.strip()}`\n"
+                        self.send_telegram_message(error_msg)
+                    else:
+                        self.send_telegram_message("✅ Keine Fehler in den Logs")
                 except Exception as e:
                     self.send_telegram_message(f"❌ Log-Fehler: {str(e)}")
                     
@@ -970,64 +1288,111 @@ class PionexFuturesGridBot:
     
     def cmd_help(self, chat_id: str):
         """Help command"""
-        help_msg = "Pionex Futures Grid Bot - Hilfe\n\n"
-        help_msg += "Grundbefehle:\n"
-        help_msg += "/start - Bot starten\n"
-        help_msg += "/stop - Bot stoppen\n"
-        help_msg += "/status - Aktueller Status\n"
-        help_msg += "/statustag - Tagesperformance\n"
-        help_msg += "/statuswoche - Wochenperformance\n"
-        help_msg += "/restart - Bot neu starten\n\n"
-        help_msg += "Informationen:\n"
-        help_msg += "/balance - Kontostand\n"
-        help_msg += "/positions - Offene Positionen\n"
-        help_msg += "/trades - Letzte Trades\n"
-        help_msg += "/config - Konfiguration\n"
-        help_msg += "/liquidate.preview - Vorschau bei sofortigem Schließen\n"
-        help_msg += "/export.performance - Exportiert alle Trades als Excel-Datei und sendet sie per Telegram\n\n"
-        help_msg += "Modus-Steuerung:\n"
-        help_msg += "/mode.auto - Auto-Modus (Bot entscheidet Long/Short nach Trend)\n"
-        help_msg += "/mode.long - Nur Long-Trades\n"
-        help_msg += "/mode.short - Nur Short-Trades\n\n"
-        help_msg += "Debugging:\n"
-        help_msg += "/debug.on - Debug aktivieren\n"
-        help_msg += "/logs.recent - Letzte Logs\n"
-        help_msg += "/debug.info - System-Info\n"
-        help_msg += "/reset.stats - Setzt alle Statistiken zurück (z.B. nach Bot-Neustart)\n"
-        help_msg += "/reporting.normal - Normales Reporting (nur Trades)\n"
-        help_msg += "/reporting.detailliert - Detailliertes Reporting (Grid-Infos bei jedem Kurscheck)\n"
-        help_msg += "/version - Zeigt das Datum des letzten Bot-Updates (Codeänderung)\n"
-        help_msg += "/set <Nummer>:<Wert> - Setzt einen Parameter live, z.B. /set 21:0\n"
-        help_msg += "/paraminfo - Zeigt alle konfigurierbaren Parameter mit Erklärung\n\n"
-        help_msg += "Parameter-Nummern und Erklärungen erhältst du mit /paraminfo.\n"
         # Telegram Limit: 4096 Zeichen, wir nehmen 3500 als Sicherheit
         max_len = 3500
-        for i in range(0, len(help_msg), max_len):
-            self.send_telegram_message(help_msg[i:i+max_len], force_plaintext=True)
+        for i in range(0, len(_HELP_MSG), max_len):
+            self.send_telegram_message(_HELP_MSG[i:i+max_len], force_plaintext=True)
     
     def send_telegram_message(self, message: str, force_plaintext: bool = False):
-        """Send message via Telegram (emojis allowed here)"""
+        """Send message via Telegram (emojis allowed here) - nicht blockierend, Versand im Hintergrund"""
+        if self.backtest_mode and not force_plaintext:
+            # Backtest: sammeln, _flush_telegram schickt die Meldungen gebündelt
+            self._tg_buffer.append(message)
+            if len(self._tg_buffer) >= self._tg_buffer_max:
+                self._flush_telegram()
+            return
+        if self.telegram_token != "YOUR_TELEGRAM_TOKEN":
+            self._tg_queue.put_nowait((message, force_plaintext))
+    
+    def _flush_telegram(self):
+        """Gepufferte Backtest-Meldungen als wenige Sammelnachrichten (< 3500 Zeichen) senden bzw. nur loggen"""
+        if not self._tg_buffer:
+            return
+        buffered, self._tg_buffer = self._tg_buffer, []
+        if self.config.get('backtest_notifications', 'batched') == 'log':
+            for message in buffered:
+                self.logger.info(message.strip())
+            return
+        if self.telegram_token == "YOUR_TELEGRAM_TOKEN":
+            return
+        sep = "\n\n─────\n\n"
+        batch = ""
+        for message in buffered:
+            message = message.strip()
+            if batch and len(batch) + len(sep) + len(message) > 3500:
+                self._tg_queue.put_nowait((batch, False))
+                batch = ""
+            batch = batch + sep + message if batch else message
+        if batch:
+            self._tg_queue.put_nowait((batch, False))
+    
+    def flush_telegram_messages(self, timeout: float = 10.0):
+        """Warte, bis alle gepufferten Telegram-Nachrichten versendet sind"""
+        q = self._tg_queue
+        with q.all_tasks_done:
+            q.all_tasks_done.wait_for(lambda: q.unfinished_tasks == 0, timeout)
+    
+    def close(self):
+        """Hintergrund-Threads beenden (Telegram-Sender nach den wartenden Nachrichten, Polling/Webhook-Flag)"""
+        self.telegram_bot_running = False
+        self._tg_stop()
+    
+    def _post_telegram(self, message: str, force_plaintext: bool = False) -> Optional[int]:
+        """sendMessage-Aufruf über die gepoolte Session; gibt den HTTP-Status zurück (None bei Verbindungsfehler)"""
         try:
-            if self.telegram_token != "YOUR_TELEGRAM_TOKEN":
-                payload = {
-                    'chat_id': self.telegram_chat_id,
-                    'text': message
-                }
-                if not force_plaintext:
-                    payload['parse_mode'] = 'HTML'
-                response = requests.post(self.telegram_url, data=payload, timeout=10)
-                if response.status_code != 200:
-                    self.logger.warning(f"Telegram message failed: {response.text}")
-                else:
-                    self.logger.info(f"Telegram message sent (first 50 chars): {message[:50]}")
+            payload = {
+                'chat_id': self.telegram_chat_id,
+                'text': message
+            }
+            if not force_plaintext:
+                payload['parse_mode'] = 'HTML'
+            response = self._http.post(self.telegram_url, data=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=10)
+            if response.status_code != 200:
+                self.logger.warning(f"Telegram message failed: {response.text}")
+                self._telegram_backoff(response.headers.get('Retry-After'))
+            else:
+                self._telegram_fail_streak = 0
+                self.logger.info(f"Telegram message sent (first 50 chars): {message[:50]}")
+            return response.status_code
         except Exception as e:
             self.logger.error(f"Telegram error: {e}")
+            self._telegram_backoff()
+            return None
+    
+    def _telegram_backoff(self, retry_after: Optional[str] = None):
+        """Nächsten Sendeversuch verzögern: Retry-After von Telegram, sonst 0.5s * 2^Fehlerserie (max. 60s)"""
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = min(60.0, 0.5 * 2 ** self._telegram_fail_streak)
+        self._telegram_fail_streak += 1
+        self._telegram_next_send_ts = time.monotonic() + delay
+    
+    def _cached(self, key: str, ttl: float, fn, use_cache: bool = True):
+        """Ergebnis von fn() für ttl Sekunden zwischenspeichern (Health-Probes); Exceptions werden nicht gecacht"""
+        now = time.monotonic()
+        hit = self._health_cache.get(key)
+        if use_cache and hit is not None and now - hit[0] < ttl:
+            return hit[1]
+        value = fn()
+        self._health_cache[key] = (now, value)
+        return value
+    
+    def _probe_telegram(self):
+        """getMe-Aufruf für Verbindungstests"""
+        return self._http.get(self._getme_url, timeout=10)
+    
+    def _start_health_probes(self, use_cache: bool = True):
+        """Binance- und Telegram-Probe gleichzeitig starten; gibt (price_future, telegram_future) zurück"""
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            price_future = pool.submit(self._cached, 'binance_price', 5, self.get_live_price, use_cache)
+            telegram_future = pool.submit(self._cached, 'telegram_getme', 30, self._probe_telegram, use_cache)
+        return price_future, telegram_future
     
     def test_telegram_connection(self):
         """Test Telegram bot connection"""
         try:
-            test_url = f"https://api.telegram.org/bot{self.telegram_token}/getMe"
-            response = requests.get(test_url, timeout=10)
+            response = self._cached('telegram_getme', 30, self._probe_telegram, use_cache=False)
             
             if response.status_code == 200:
                 bot_info = response.json()
@@ -1047,27 +1412,15 @@ class PionexFuturesGridBot:
     
     def load_data(self) -> pd.DataFrame:
         """Load and prepare historical data"""
-        try:
-            # Lade CSV mit Semikolon-Trenner und deutschem Dezimaltrennzeichen
-            data = pd.read_csv(self.config['data_file'], sep=';', decimal=',')
-        except Exception as e:
-            self.logger.error(f"Fehler beim Einlesen der CSV-Datei: {e}")
-            raise
-        
-        # Standardize column names
-        data.columns = [col.lower().strip() for col in data.columns]
-        
-        # Ensure required columns exist
-        required_cols = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        for col in required_cols:
-            if col not in data.columns:
-                raise ValueError(f"Missing required column: {col}")
-        
-        # Convert timestamp
-        data['timestamp'] = pd.to_datetime(data['timestamp'])
-        
-        # Sort by timestamp
-        data = data.sort_values('timestamp').reset_index(drop=True)
+        if self._prices is not None:
+            data = pd.DataFrame({name: self._prices[name] for name in PRICE_DTYPE.names})
+        else:
+            try:
+                # Lade CSV mit Semikolon-Trenner und deutschem Dezimaltrennzeichen (typisiert, float32)
+                data = read_price_csv(self.config['data_file'])
+            except Exception as e:
+                self.logger.error(f"Fehler beim Einlesen der CSV-Datei: {e}")
+                raise
         
         # Technische Indikatoren hinzufügen
         data = self.add_technical_indicators(data)
@@ -1078,39 +1431,26 @@ class PionexFuturesGridBot:
     
     def add_technical_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Füge technische Indikatoren hinzu"""
-        closes = data['close'].astype(float)
-        highs = data['high'].astype(float)
-        lows = data['low'].astype(float)
-        volumes = data['volume'].astype(float)
-        
-        # RSI
-        data['rsi'] = ta.momentum.RSIIndicator(closes).rsi()
-        
-        # MACD
-        macd = ta.trend.MACD(closes)
-        data['macd'] = macd.macd()
-        data['macd_signal'] = macd.macd_signal()
-        data['macd_hist'] = macd.macd_diff()
-        
-        # Bollinger Bands
-        bb = ta.volatility.BollingerBands(closes)
-        data['bb_upper'] = bb.bollinger_hband()
-        data['bb_middle'] = bb.bollinger_mavg()
-        data['bb_lower'] = bb.bollinger_lband()
-        
-        # Volatilität (ATR)
-        data['atr'] = ta.volatility.AverageTrueRange(highs, lows, closes).average_true_range()
+        closes = data['close'].to_numpy(dtype=float)
+        highs = data['high'].to_numpy(dtype=float)
+        lows = data['low'].to_numpy(dtype=float)
+        volumes = data['volume'].to_numpy(dtype=float)
         
-        # Volume SMA (einfache Berechnung)
-        data['volume_sma'] = volumes.rolling(window=20).mean()
-        
-        # Trend-Stärke (ADX)
-        data['adx'] = ta.trend.ADXIndicator(highs, lows, closes).adx()
+        # RSI, MACD, Bollinger Bands, ATR, Volume SMA, ADX und rollende Renditen-Volatilität
+        # (über volatility_lookback Kerzen, für calculate_volatility) - gemeinsam berechnet, in einem Schritt zugewiesen
+        data = data.assign(**_indicators.compute_all(highs, lows, closes, volumes, self.volatility_lookback - 1))
         
         return data
     
     def auto_set_grid_range(self):
         """Auto-set grid range based on current market conditions, mit Anpassung für Seitwärtsphasen und dynamischem Investment"""
+        # Nur neu rechnen, wenn sich die Daten (Backtest) bzw. die Minute (Live) geändert haben
+        if getattr(self, 'data', None) is not None:
+            cache_key = (len(self.data), float(self.data['close'].iat[-1]), self.config.get('grid_count'))
+        else:
+            cache_key = ('live', int(time.monotonic() // 60), self.config.get('grid_count'))
+        if cache_key == self._grid_range_cache_key:
+            return
         try:
             if hasattr(self, 'data') and self.data is not None:
                 closes = self.data['close'].astype(float)
@@ -1144,6 +1484,7 @@ class PionexFuturesGridBot:
                 self.config['investment_amount'] = new_investment
                 self.logger.info(f"Seitwärtsmarkt erkannt: Gridspacing auf {grid_spacing:.2f} USDT, Investment pro Grid auf {new_investment:.2f} USDT angepasst.")
                 self.send_telegram_message(f"⚡️ Sehr niedrige Volatilität erkannt! Gridspacing automatisch auf {grid_spacing:.2f} USDT gesetzt und Investment pro Grid auf {new_investment:.2f} USDT reduziert.")
+                self._grid_range_cache_key = cache_key
                 return
 
             # Standard-Logik
@@ -1155,6 +1496,7 @@ class PionexFuturesGridBot:
             if '_orig_investment_amount' in self.config:
                 self.config['investment_amount'] = self.config['_orig_investment_amount']
             self.logger.info(f"Auto-set grid range: {self.config['grid_lower_price']:.2f} - {self.config['grid_upper_price']:.2f}")
+            self._grid_range_cache_key = cache_key
         except Exception as e:
             self.logger.error(f"Error in auto_set_grid_range: {e}")
             current_price = self.get_live_price() or 50000
@@ -1174,9 +1516,10 @@ class PionexFuturesGridBot:
             upper = center + grid_size * ((grid_count-1)/2)
             self.config["grid_lower_price"] = lower
             self.config["grid_upper_price"] = upper
-            grid_prices = [lower + i*grid_size for i in range(grid_count)]
+            grid_arr = np.linspace(lower, upper, grid_count)
             self.logger.info(f"Static grid: {grid_count} x {grid_size} USDT von {lower:.2f} bis {upper:.2f}")
-            return grid_prices
+            self._precompute_grid(grid_arr)
+            return grid_arr.tolist()
         else:
             self.auto_set_grid_range()
             lower_price = float(self.config['grid_lower_price'])
@@ -1184,10 +1527,51 @@ class PionexFuturesGridBot:
             grid_count = self.config['grid_count']
             if grid_count < 2:
                 grid_count = 2
-            grid_spacing = (upper_price - lower_price) / (grid_count - 1)
-            grid_prices = [lower_price + i * grid_spacing for i in range(grid_count)]
-            self.logger.info(f"Grid prices: {len(grid_prices)} levels from {lower_price:.2f} to {upper_price:.2f}")
-            return grid_prices
+            grid_arr = np.linspace(lower_price, upper_price, grid_count)
+            self.logger.info(f"Grid prices: {grid_count} levels from {lower_price:.2f} to {upper_price:.2f}")
+            self._precompute_grid(grid_arr)
+            return grid_arr.tolist()
+    
+    def _precompute_grid(self, grid_prices):
+        """Grid-Levels einmalig als sortiertes NumPy-Array ablegen (für searchsorted-Lookups) und Level-IDs vergeben"""
+        levels = np.asarray(grid_prices, dtype=np.float64)
+        self._grid_px = np.sort(levels)
+        # Level-ID = Index in grid_prices; gleiche Preise teilen sich einen Eimer (und ihre Einträge in _grid_empty)
+        self._grid_levels = levels
+        self._grid_empty = np.ones(len(levels), dtype=bool)  # True = keine offene Position auf dem Level
+        self._grid_id = {}
+        buckets = {}
+        aliases = {}
+        self._grid_by_id = []
+        for gid, price in enumerate(levels.tolist()):
+            self._grid_id.setdefault(price, gid)
+            self._grid_by_id.append(buckets.setdefault(price, []))
+            aliases.setdefault(price, []).append(gid)
+        self._grid_alias = [aliases[price] for price in levels.tolist()]
+        # Offene Positionen den neuen Levels zuordnen (-1 = liegt auf keinem Level mehr)
+        for position in getattr(self, 'positions', ()):
+            self._assign_grid_id(position)
+    
+    def _assign_grid_id(self, position: dict):
+        """grid_id aus dem Grid-Preis der Order bestimmen und die Position in den Eimer ihres Levels legen"""
+        gid = self._grid_id.get(position.get('grid_price', position['entry_price']), -1)
+        position['grid_id'] = gid
+        slot = self._pos_index.get(position['id'])
+        if slot is not None:
+            self._pos_arr['grid_id'][slot] = gid
+        if gid >= 0:
+            self._grid_by_id[gid].append(position)
+            for alias in self._grid_alias[gid]:
+                self._grid_empty[alias] = False
+    
+    def _crossed_levels(self, last_price: float, price: float) -> list:
+        """Grid-Levels, die zwischen zwei Ticks gekreuzt wurden (aufsteigend): fallend [price, last_price), steigend (last_price, price]"""
+        grid_px = self._grid_px
+        if price < last_price:
+            lo, hi = np.searchsorted(grid_px, price, side='left'), np.searchsorted(grid_px, last_price, side='left')
+        else:
+            lo, hi = np.searchsorted(grid_px, last_price, side='right'), np.searchsorted(grid_px, price, side='right')
+        return grid_px[lo:hi].tolist()
     
     def calculate_position_size(self, price: float) -> float:
         """Calculate position size based on investment amount and leverage"""
@@ -1225,25 +1609,58 @@ class PionexFuturesGridBot:
     
     def check_liquidation(self, current_price: float, position: Dict) -> bool:
         """Check if position should be liquidated"""
-        liquidation_price = position['liquidation_price']
-        is_long = position['is_long']
-        
-        if is_long and current_price <= liquidation_price:
-            return True
-        elif not is_long and current_price >= liquidation_price:
-            return True
-        
-        return False
+        return _grid_sim.liquidation_hit(current_price, position['liquidation_price'], position['sign'] > 0)
     
     def calculate_funding_fee(self, position: Dict, time_diff_hours: float) -> float:
         """Calculate funding fee for position"""
-        funding_rate = self.config['funding_rate']
-        position_value = position['size'] * position['entry_price']
-        
-        # Funding fee = Position Value * Funding Rate * (Time in hours / 8)
-        funding_fee = position_value * funding_rate * (time_diff_hours / 8)
-        
-        return funding_fee
+        return _grid_sim.funding_fee(position['size'], position['entry_price'],
+                                     self.config['funding_rate'], time_diff_hours)
+
+    def _add_position(self, position: dict):
+        """Position öffnen und in die SoA-Spalten eintragen"""
+        n = self._pos_count
+        if n == len(self._pos_arr):
+            self._pos_arr = np.concatenate([self._pos_arr, np.zeros_like(self._pos_arr)])
+        liq = position.get('liquidation_price') or self.calculate_liquidation_price(
+            position['entry_price'], position['size'], position['sign'] > 0, position['leverage'])
+        self._pos_arr[n] = (position['id'], position['size'], position['entry_price'], position['leverage'],
+                            position['sign'], liq, position.get('buy_fee', 0.0), -1)
+        self._pos_index[position['id']] = n
+        self._pos_count = n + 1
+        self._notional += position['size'] * position['entry_price']
+        self.positions.append(position)
+        self._assign_grid_id(position)
+
+    def _remove_position(self, position: dict):
+        """Position per ID in O(1) entfernen; letzter Slot rückt nach (swap-pop), damit Spalten und Liste dicht bleiben"""
+        slot = self._pos_index.pop(position['id'])
+        last = self._pos_count - 1
+        if slot != last:
+            self._pos_arr[slot] = self._pos_arr[last]
+            moved = self.positions[last]
+            self.positions[slot] = moved
+            self._pos_index[moved['id']] = slot
+        self.positions.pop()
+        self._pos_count = last
+        # Ohne offene Positionen exakt auf 0 zurücksetzen, damit sich keine Rundungsfehler ansammeln
+        self._notional = self._notional - position['size'] * position['entry_price'] if last else 0.0
+        if position['grid_id'] >= 0:
+            at_level = self._grid_by_id[position['grid_id']]
+            del at_level[next(i for i, p in enumerate(at_level) if p is position)]
+            if not at_level:
+                for alias in self._grid_alias[position['grid_id']]:
+                    self._grid_empty[alias] = True
+
+    def _clear_positions(self):
+        """Alle offenen Positionen auf einmal austragen (statt Einzel-Entfernung Slot für Slot)"""
+        for position in self.positions:
+            if position['grid_id'] >= 0:
+                self._grid_by_id[position['grid_id']].clear()
+        self._grid_empty[:] = True
+        self.positions.clear()
+        self._pos_index.clear()
+        self._pos_count = 0
+        self._notional = 0.0
 
     def execute_trade(self, price: float, side: str, timestamp: datetime, leverage: float = None) -> bool:
         """Execute a trade with realistic conditions and detailed Telegram notifications"""
@@ -1263,9 +1680,11 @@ class PionexFuturesGridBot:
         else:
             position_side = side  # fallback
         position = {
-            'id': len(self.positions) + 1,
+            'id': self._next_pos_id,
             'side': position_side,
+            'sign': 1 if position_side == 'long' else -1,  # Richtung als Vorzeichen für verzweigungsfreie PnL-Formeln
             'entry_price': executed_price,
+            'grid_price': price,  # Grid-Level der Order (daraus wird grid_id)
             'size': position_size,
             'timestamp': timestamp,
             'leverage': leverage,
@@ -1273,20 +1692,36 @@ class PionexFuturesGridBot:
             'trailing_stop': executed_price * (1 - self.trailing_stop_pct) if position_side == 'long' else executed_price * (1 + self.trailing_stop_pct),
             'trailing_high': executed_price if position_side == 'long' else executed_price
         }
-        self.positions.append(position)
+        self._next_pos_id += 1
+        self._add_position(position)
         fee = position_size * executed_price * self.config['fee_rate']
         self.total_fees += fee
-        # Detaillierte Telegram-Benachrichtigung für Trade
+        # Detaillierte Telegram-Benachrichtigung für Trade (nur aufbauen, wenn sie jemand bekommt)
+        if self._notifications_enabled():
+            self._notify_trade(position, side, executed_price, position_size, leverage, fee, timestamp)
+        
+        self.logger.info("Trade executed: %s %.2f at %.2f (Leverage: %.1fx)", side.upper(), position_size, executed_price, leverage)
+        return True
+
+    def _notifications_enabled(self) -> bool:
+        """False, wenn Meldungen ohnehin verworfen würden (kein Token und Backtest-Meldungen nicht im Log)"""
+        if self.backtest_mode and self.config.get('backtest_notifications', 'batched') == 'log':
+            return True
+        return self.telegram_token != "YOUR_TELEGRAM_TOKEN"
+
+    def _notify_trade(self, position: dict, side: str, executed_price: float, position_size: float,
+                      leverage: float, fee: float, timestamp: datetime):
+        """Trade-Meldung mit Grid-Sell-, Take-Profit- und Stop-Loss-Zielen senden"""
         # Berechne nächstes Grid-Sell-Level oberhalb des Einstiegskurses
         next_grid_sell = None
         dist_grid = None
         pct_grid = None
-        if self.grid_prices:
-            higher_grids = [g for g in self.grid_prices if g > executed_price]
-            if higher_grids:
-                next_grid_sell = min(higher_grids)
-                dist_grid = next_grid_sell - executed_price
-                pct_grid = (dist_grid / executed_price) * 100
+        grid_arr = self._grid_px
+        idx = np.searchsorted(grid_arr, executed_price, side='right')  # erstes Level > Einstieg
+        if idx < len(grid_arr):
+            next_grid_sell = float(grid_arr[idx])
+            dist_grid = next_grid_sell - executed_price
+            pct_grid = (dist_grid / executed_price) * 100
         tp = executed_price * (1 + self.config['take_profit_pct'])
         dist_tp = tp - executed_price
         pct_tp = (dist_tp / executed_price) * 100
@@ -1306,6 +1741,10 @@ class PionexFuturesGridBot:
         sell_fee_tp = position_size * tp * self.config['fee_rate']
         tp_pnl = ((tp - executed_price) * position_size * leverage) - fee - sell_fee_tp
         tp_pct = (tp_pnl / (executed_price * position_size)) * 100
+        if next_grid_sell:
+            grid_line = f"• Nächstes Grid-Sell: ${next_grid_sell:,.2f} (+{dist_grid:,.2f} USDT, +{pct_grid:.2f}%) | Netto PnL: {grid_sell_pnl:+.2f} USDT ({grid_sell_pct:+.2f}%)"
+        else:
+            grid_line = "• Nächstes Grid-Sell: Kein Grid oberhalb"
         trade_msg = f"""
 💚 <b>TRADE AUSGEFÜHRT: {side.upper()}</b>
 
@@ -1316,28 +1755,27 @@ class PionexFuturesGridBot:
 • Wert: ${position_size * executed_price:,.2f}
 • Hebel: {leverage:.1f}x
 
-📊 <b>Verkaufsziele:</b>\n"""
-        if next_grid_sell:
-            trade_msg += f"• Nächstes Grid-Sell: ${next_grid_sell:,.2f} (+{dist_grid:,.2f} USDT, +{pct_grid:.2f}%) | Netto PnL: {grid_sell_pnl:+.2f} USDT ({grid_sell_pct:+.2f}%)\n"
-        else:
-            trade_msg += "• Nächstes Grid-Sell: Kein Grid oberhalb\n"
-        trade_msg += f"• Take Profit: ${tp:,.2f} (+{dist_tp:,.2f} USDT, +{pct_tp:.2f}%) | Netto PnL: {tp_pnl:+.2f} USDT ({tp_pct:+.2f}%)\n"
-        trade_msg += f"• Stop Loss: ${sl:,.2f} ({dist_sl:,.2f} USDT, {pct_sl:.2f}%)\n"
-        trade_msg += f"\n💸 Gebühr: ${fee:.2f}\n⏰ Zeit: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n        """
+📊 <b>Verkaufsziele:</b>
+{grid_line}
+• Take Profit: ${tp:,.2f} (+{dist_tp:,.2f} USDT, +{pct_tp:.2f}%) | Netto PnL: {tp_pnl:+.2f} USDT ({tp_pct:+.2f}%)
+• Stop Loss: ${sl:,.2f} ({dist_sl:,.2f} USDT, {pct_sl:.2f}%)
+
+💸 Gebühr: ${fee:.2f}
+⏰ Zeit: {timestamp:%Y-%m-%d %H:%M:%S}
+        """
         self.send_telegram_message(trade_msg)
-        
-        self.logger.info(f"Trade executed: {side.upper()} {position_size:.2f} at {executed_price:.2f} (Leverage: {leverage:.1f}x)")
-        return True
+
+    def _record_trade(self, trade: dict):
+        """Trade anhängen und die NumPy-Spalten (chronologisch, für searchsorted) fortschreiben"""
+        self._trades.append(trade)
+        self.trades.append(trade)
 
     def close_position(self, position: dict, price: float, timestamp: datetime) -> float:
         """Close position and calculate PnL with detailed Telegram notification (inkl. Kauf- und Verkaufsgebühr)"""
         executed_price = self.simulate_order_execution(price, position['side'] == 'sell', position['size'])
         if executed_price is None:
             return 0
-        if position['side'] == 'long':
-            pnl = (executed_price - position['entry_price']) * position['size'] * position['leverage']
-        else:
-            pnl = (position['entry_price'] - executed_price) * position['size'] * position['leverage']
+        pnl = position['sign'] * (executed_price - position['entry_price']) * position['size'] * position['leverage']
         sell_fee = position['size'] * executed_price * self.config['fee_rate']
         buy_fee = position.get('buy_fee', 0.0)
         total_fee = buy_fee + sell_fee
@@ -1354,12 +1792,12 @@ class PionexFuturesGridBot:
             'pnl': pnl,
             'leverage': position['leverage']
         }
-        self.trades.append(trade)
-        unrealized_pnl = (price - position['entry_price']) * position['size'] * position['leverage']
-        close_msg = f"""
+        self._record_trade(trade)
+        if self._notifications_enabled():
+            close_msg = f"""
 🔴 <b>POSITION GESCHLOSSEN: #{position['id']}</b>\n\n💰 <b>Trade Details:</b>\n• Einstiegskurs: ${position['entry_price']:,.2f}\n• Verkaufskurs: ${executed_price:,.2f}\n• Menge: {position['size']:.6f} BTC\n• Hebel: {position['leverage']:.1f}x\n\n📈 <b>Realisierter Gewinn/Verlust:</b>\n• PnL: ${pnl:,.2f} ({pnl_percentage:+.2f}%)\n• Gebühr Buy: ${buy_fee:.2f}\n• Gebühr Sell: ${sell_fee:.2f}\n• Netto PnL: ${pnl - buy_fee - sell_fee:,.2f}\n\n💰 <b>Accountbalance nach Verkauf:</b> {self.current_balance:,.2f} USDT\n\n⏱️ Zeit: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n"""
-        self.send_telegram_message(close_msg)
-        self.logger.info(f"Position closed: PnL {pnl:.2f}, Fee Buy {buy_fee:.2f}, Fee Sell {sell_fee:.2f}")
+            self.send_telegram_message(close_msg)
+        self.logger.info("Position closed: PnL %.2f, Fee Buy %.2f, Fee Sell %.2f", pnl, buy_fee, sell_fee)
         return pnl
     
     def update_performance_metrics(self):
@@ -1382,29 +1820,40 @@ class PionexFuturesGridBot:
         if index < self.volatility_lookback:
             return 0.02  # Default 2%
         
-        recent_data = data.iloc[index-self.volatility_lookback:index]
-        returns = recent_data['close'].pct_change().dropna()
-        return returns.std()
+        # Vorberechnete Spalte aus add_technical_indicators: Fenster endet eine Kerze vor index
+        vol = data['vol_roll'].iat[index - 1]
+        return 0.02 if math.isnan(vol) else float(vol)
+
+    def _trend_columns(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Indikator-Spalten als NumPy-Arrays, einmal pro DataFrame zwischengespeichert"""
+        if data is not self._cols_src:
+            self._cols = {c: data[c].to_numpy(dtype=float)
+                          for c in ('rsi', 'macd', 'macd_signal', 'adx', 'bb_upper', 'bb_lower', 'close')}
+            self._cols_src = data
+        return self._cols
 
     def detect_trend(self, data: pd.DataFrame, index: int) -> str:
         """Trend-Erkennung basierend auf technischen Indikatoren"""
         if index < 50:
             return 'neutral'
         
-        current = data.iloc[index]
+        cols = self._trend_columns(data)
+        bb_upper = cols['bb_upper'][index]
+        bb_lower = cols['bb_lower'][index]
+        adx = cols['adx'][index]
         
         # RSI-basierte Trend-Erkennung
-        rsi_trend = 'bullish' if current['rsi'] > 50 else 'bearish'
+        rsi_trend = 'bullish' if cols['rsi'][index] > 50 else 'bearish'
         
         # MACD-basierte Trend-Erkennung
-        macd_trend = 'bullish' if current['macd'] > current['macd_signal'] else 'bearish'
+        macd_trend = 'bullish' if cols['macd'][index] > cols['macd_signal'][index] else 'bearish'
         
         # ADX für Trend-Stärke
-        trend_strength = current['adx'] / 100.0 if not pd.isna(current['adx']) else 0.5
+        trend_strength = adx / 100.0 if not math.isnan(adx) else 0.5
         
         # Bollinger Bands Position
-        if not pd.isna(current['bb_upper']) and not pd.isna(current['bb_lower']):
-            bb_position = (current['close'] - current['bb_lower']) / (current['bb_upper'] - current['bb_lower'])
+        if not math.isnan(bb_upper) and not math.isnan(bb_lower):
+            bb_position = (cols['close'][index] - bb_lower) / (bb_upper - bb_lower)
             bb_trend = 'bullish' if bb_position > 0.7 else 'bearish' if bb_position < 0.3 else 'neutral'
         else:
             bb_trend = 'neutral'
@@ -1430,21 +1879,8 @@ class PionexFuturesGridBot:
         
         base_leverage = self.config['leverage']
         
-        # Volatilitäts-basierte Anpassung
-        if volatility < 0.01:  # Niedrige Volatilität
-            leverage_multiplier = 1.2
-        elif volatility > 0.05:  # Hohe Volatilität
-            leverage_multiplier = 0.7
-        else:
-            leverage_multiplier = 1.0
-        
-        # Trend-basierte Anpassung
-        if trend == 'bullish':
-            trend_multiplier = 1.1
-        elif trend == 'bearish':
-            trend_multiplier = 0.9
-        else:
-            trend_multiplier = 1.0
+        # Volatilitäts- und Trend-Anpassung (Faktoren je Regime gecacht)
+        leverage_multiplier, trend_multiplier, _, _ = _regime_multipliers(_vol_regime(volatility), trend)
         
         # Balance-basierte Anpassung (höhere Balance = höherer Hebel)
         balance_multiplier = min(1.5, 1.0 + (balance / 100000))
@@ -1461,21 +1897,8 @@ class PionexFuturesGridBot:
         
         base_amount = self.config['investment_amount']
         
-        # Volatilitäts-basierte Anpassung
-        if volatility < 0.01:
-            vol_multiplier = 1.3  # Mehr Positionen bei niedriger Volatilität
-        elif volatility > 0.05:
-            vol_multiplier = 0.7  # Weniger Positionen bei hoher Volatilität
-        else:
-            vol_multiplier = 1.0
-        
-        # Trend-basierte Anpassung
-        if trend == 'bullish':
-            trend_multiplier = 1.2
-        elif trend == 'bearish':
-            trend_multiplier = 0.8
-        else:
-            trend_multiplier = 1.0
+        # Volatilitäts- und Trend-Anpassung (Faktoren je Regime gecacht)
+        _, _, vol_multiplier, trend_multiplier = _regime_multipliers(_vol_regime(volatility), trend)
         
         # Balance-basierte Anpassung
         balance_multiplier = min(2.0, 1.0 + (self.current_balance / 50000))
@@ -1512,8 +1935,8 @@ class PionexFuturesGridBot:
         start_price = max(lower_price, start_price)
         end_price = min(upper_price, end_price)
         
-        grid_prices = [start_price + i * grid_spacing for i in range(grid_count)]
-        return grid_prices
+        # Abstand bleibt grid_spacing (end_price begrenzt das Raster nicht)
+        return np.linspace(start_price, start_price + (grid_count - 1) * grid_spacing, grid_count).tolist()
 
     def check_liquidity(self, price: float, volume: float) -> bool:
         """Prüfe ob genügend Liquidität vorhanden ist"""
@@ -1522,13 +1945,16 @@ class PionexFuturesGridBot:
 
     def apply_slippage_and_spread(self, price: float, is_buy: bool) -> float:
         """Wende Slippage und Spread an"""
-        slippage = price * self.slippage_rate * random.uniform(0.5, 1.5)
-        spread = price * self.spread_rate
-        
-        if is_buy:
-            return price + slippage + spread
-        else:
-            return price - slippage - spread
+        return _grid_sim.exec_price(price, is_buy, self.slippage_rate, self.spread_rate, self._next_rand())
+
+    def _next_rand(self) -> float:
+        """Nächster vorgezogener Slippage-Multiplikator aus self._rand (0.5-1.5), bei Bedarf nachgefüllt"""
+        i = self._rand_pos
+        if i >= len(self._rand):
+            self._rand = self._rng.uniform(0.5, 1.5, size=max(1024, len(self._rand)))
+            i = 0
+        self._rand_pos = i + 1
+        return self._rand[i]
 
     def simulate_order_execution(self, price: float, is_buy: bool, size: float) -> Optional[float]:
         """Simuliere realistische Order-Ausführung"""
@@ -1546,10 +1972,7 @@ class PionexFuturesGridBot:
         leverage = position['leverage']
         
         # Berechne PnL
-        if position['side'] == 'long':
-            pnl = (current_price - entry_price) * size * leverage
-        else:
-            pnl = (entry_price - current_price) * size * leverage
+        pnl = position['sign'] * (current_price - entry_price) * size * leverage
         
         margin = size
         margin_ratio = (margin + pnl) / margin
@@ -1582,10 +2005,7 @@ class PionexFuturesGridBot:
         size = position['size']
         leverage = position['leverage']
         
-        if position['side'] == 'long':
-            pnl = (current_price - entry_price) * size * leverage
-        else:
-            pnl = (entry_price - current_price) * size * leverage
+        pnl = position['sign'] * (current_price - entry_price) * size * leverage
         
         margin = size
         margin_ratio = (margin + pnl) / margin
@@ -1593,48 +2013,59 @@ class PionexFuturesGridBot:
         
         return margin_ratio < liquidation_buffer
 
+    def _liquidation_candidates(self, current_price: float) -> list:
+        """check_liquidation_risk für alle offenen Positionen auf einmal über die SoA-Spalten; Reihenfolge wie self.positions"""
+        n = self._pos_count
+        if n == 0:
+            return []
+        arr = self._pos_arr
+        size = arr['size'][:n]
+        pnl = arr['side_sign'][:n] * (current_price - arr['entry'][:n]) * size * arr['lev'][:n]
+        margin_ratio = (size + pnl) / size
+        return [self.positions[j] for j in np.flatnonzero(margin_ratio < self.config['liquidation_buffer'])]
+
     def apply_funding_fees(self, timestamp: datetime):
         """Apply funding fees to open positions"""
         if len(self.positions) > 0:
             funding_rate = self.config['funding_rate']
-            total_position_value = sum(pos['size'] * pos['entry_price'] for pos in self.positions)
+            total_position_value = self._notional
+            if self.debug_mode:
+                n = self._pos_count
+                expected = float(np.dot(self._pos_arr['size'][:n], self._pos_arr['entry'][:n]))
+                if not math.isclose(total_position_value, expected, rel_tol=1e-9, abs_tol=1e-9):
+                    self.logger.warning(f"Notional-Drift: laufend {total_position_value:.6f}, Summe {expected:.6f}")
             funding_fee = total_position_value * funding_rate
             
             self.funding_fees += funding_fee
             self.total_fees += funding_fee
             self.current_balance -= funding_fee
 
-    def run_backtest(self) -> dict:
-        """Run backtest with realistic conditions and optimizations"""
+    def run_backtest(self, on_progress: Optional[Callable[[dict], bool]] = None, progress_every: int = 1440,
+                     abort_drawdown: Optional[float] = None) -> dict:
+        """Run backtest with realistic conditions and optimizations.
+        on_progress bekommt alle progress_every Bars {'bar', 'balance', 'drawdown'}; gibt er True zurück,
+        wird der Lauf abgebrochen (nur Python-Engine). abort_drawdown bricht in beiden Engines ab,
+        sobald der Drawdown bei einer dieser Prüfungen den Anteil überschreitet."""
         self.logger.info("Starting optimized realistic backtest...")
+        if abort_drawdown and on_progress is None:
+            on_progress = lambda state: state['drawdown'] > abort_drawdown
         
         # Telegram: Backtest Start
-        start_msg = f"""
-🚀 <b>Pionex Grid Bot Backtest gestartet!</b>
-
-📊 <b>Konfiguration:</b>
-• Mode: {self.config['mode'].upper()}
-• Leverage: {self.config['leverage']}x
-• Grid Count: {self.config['grid_count']}
-• Investment: ${self.config['investment_amount']:,.0f}
-• Initial Balance: ${self.config['initial_balance']:,.0f}
-
-⚙️ <b>Optimierungen aktiv:</b>
-• Dynamische Hebelwirkung
-• Adaptive Grid-Preise
-• Erweitertes Risikomanagement
-• Trend-Filterung
-        """
+        start_msg = _fmt_backtest_start(
+            mode=self.config['mode'].upper(), leverage=self.config['leverage'], grid_count=self.config['grid_count'],
+            investment=self.config['investment_amount'], initial_balance=self.config['initial_balance'])
         self.send_telegram_message(start_msg)
         
         data = self.load_data()
         initial_balance = self.current_balance
-        max_balance = self.current_balance
-        min_balance = self.current_balance
         
         # Initialisiere Grid-Preise
         self.grid_prices = self.calculate_grid_prices()
         
+        # Slippage-Multiplikatoren für den ganzen Lauf auf einmal ziehen (bis zu 2 Orders pro Kerze)
+        self._rand = self._rng.uniform(0.5, 1.5, size=max(1, 2 * len(data)))
+        self._rand_pos = 0
+        
         # Zeitbegrenzung: Nur 1 Minute testen
         start_time = time.time()
         max_runtime = 60  # 60 Sekunden
@@ -1643,80 +2074,139 @@ class PionexFuturesGridBot:
         last_progress_update = 0
         progress_interval = 25  # Alle 25% Fortschritt melden
         
-        for i, row in data.iterrows():
-            # Zeitprüfung
-            if time.time() - start_time > max_runtime:
-                self.logger.info(f"Zeitbegrenzung erreicht nach {max_runtime} Sekunden")
-                break
+        # Benachrichtigungen während des Laufs puffern und pro simuliertem Tag gebündelt senden
+        self.backtest_mode = True
+        last_day = None
+        stopped_early = False
+        try:
+            if self.config.get('backtest_engine', 'python') == 'numba':
+                # Kompilierter Kern (_grid_sim) statt Python-Schleife, ohne Einzel-Benachrichtigungen pro Trade
+                balances, stopped_early = self._run_backtest_kernel(data, abort_drawdown or 0.0, progress_every)
+                if stopped_early:
+                    self.logger.info(f"Backtest vorzeitig abgebrochen bei Bar {len(balances)}/{len(data)}")
+            else:
+                # Rohe Spalten statt iterrows (keine Series pro Zeile); Zeitstempel bleiben pd.Timestamp
+                closes = data['close'].to_numpy(dtype=self.config['backtest_price_dtype'])
+                timestamps = data['timestamp'].tolist()
+                n = len(closes)
+                balances = np.empty(n)  # Kontostand nach jedem Bar (Drawdown nach der Schleife)
+                next_progress_i = _progress_index(last_progress_update + progress_interval, n)
+                next_funding_i = 0  # Nächster Funding-Bar (feste Schrittweite statt Modulo pro Bar)
+                next_callback_i = progress_every if on_progress else n  # Nächster on_progress-Aufruf
+                peak_balance = initial_balance
+                # Attribute und Methoden, die jeder Bar braucht, einmal als Locals binden
+                clock = time.time
+                grid_prices = self.grid_prices
+                grid_by_id = self._grid_by_id  # Eimer und Maske werden in-place gepflegt, Bindung bleibt gültig
+                grid_levels = self._grid_levels
+                grid_empty = self._grid_empty
+                # Vektorisierte Vorab-Prüfung: Bars über dem höchsten Level lösen ohne offene Positionen nichts aus
+                above_grid = closes > grid_levels.max() if len(grid_levels) else np.ones(n, dtype=bool)
+                invest = self.config['investment_amount']
+                execute_trade = self.execute_trade
+                close_position = self.close_position
+                remove_position = self._remove_position
+                liquidation_candidates = self._liquidation_candidates
+                warn = self.logger.warning
+                for i in range(n):
+                    # Zeitprüfung
+                    if clock() - start_time > max_runtime:
+                        self.logger.info(f"Zeitbegrenzung erreicht nach {max_runtime} Sekunden")
+                        balances = balances[:i]
+                        break
+                
+                    # Zwischenstand an den Aufrufer (z.B. Optimizer), der den Lauf vorzeitig beenden kann
+                    if i == next_callback_i:
+                        peak_balance = max(peak_balance, float(balances[i - progress_every:i].max()))
+                        next_callback_i += progress_every
+                        if on_progress({'bar': i, 'balance': self.current_balance,
+                                        'drawdown': (peak_balance - self.current_balance) / peak_balance}):
+                            self.logger.info(f"Backtest vorzeitig abgebrochen bei Bar {i}/{n}")
+                            balances = balances[:i]
+                            stopped_early = True
+                            break
                 
-            current_price = float(row['close'])
-            timestamp = row['timestamp']
+                    current_price = float(closes[i])
+                    timestamp = timestamps[i]
+                    day = timestamp.date()
+                    if day != last_day:
+                        self._flush_telegram()
+                        last_day = day
             
-            # Progress logging und Telegram Updates
-            progress = (i / len(data)) * 100
-            if progress >= last_progress_update + progress_interval:
-                elapsed_time = time.time() - start_time
-                current_pnl = self.current_balance - initial_balance
+                    # Progress logging und Telegram Updates (nur an den vorab berechneten Schwellen-Indizes)
+                    if i >= next_progress_i:
+                        progress = (i / n) * 100
+                        elapsed_time = clock() - start_time
+                        current_pnl = self.current_balance - initial_balance
                 
-                progress_msg = f"""
-📈 <b>Backtest Fortschritt: {progress:.0f}%</b>
-
-💰 <b>Aktueller Status:</b>
-Balance: ${self.current_balance:,.2f}
-PnL: ${current_pnl:,.2f} ({current_pnl/initial_balance*100:.2f}%)
-Trades: {len([t for t in self.trades if 'pnl' in t])}
-Laufzeit: {elapsed_time:.1f}s
-                """
-                self.send_telegram_message(progress_msg)
-                last_progress_update = progress
+                        progress_msg = _fmt_backtest_progress(
+                            progress=progress, balance=self.current_balance, pnl=current_pnl,
+                            pnl_pct=current_pnl / initial_balance * 100, trades=len(self._trades), elapsed=elapsed_time)
+                        self.send_telegram_message(progress_msg)
+                        last_progress_update = progress
+                        next_progress_i = _progress_index(last_progress_update + progress_interval, n)
                 
-                self.logger.info(f"Progress: {progress:.1f}% - Balance: {self.current_balance:.2f} - Zeit: {elapsed_time:.1f}s")
+                        self.logger.info(f"Progress: {progress:.1f}% - Balance: {self.current_balance:.2f} - Zeit: {elapsed_time:.1f}s")
             
-            # Apply funding fees every 8 hours
-            if i % 480 == 0:
-                self.apply_funding_fees(timestamp)
+                    # Apply funding fees every 8 hours
+                    if i == next_funding_i:
+                        self.apply_funding_fees(timestamp)
+                        next_funding_i += _FUNDING_EVERY_BARS
             
-            # Check liquidations
-            positions_to_remove = []
-            for position in self.positions:
-                if self.check_liquidation_risk(position, current_price):
-                    self.liquidated_positions += 1
-                    self.logger.warning(f"Position liquidated at {current_price}")
-                    positions_to_remove.append(position)
+                    if above_grid[i] and not self._pos_count:
+                        balances[i] = self.current_balance
+                        continue
             
-            for position in positions_to_remove:
-                self.positions.remove(position)
+                    # Check liquidations (eine Maske über alle offenen Positionen)
+                    for position in liquidation_candidates(current_price):
+                        self.liquidated_positions += 1
+                        warn("Position liquidated at %s", current_price)
+                        remove_position(position)
             
-            # Grid trading logic
-            for grid_price in self.grid_prices:
-                # Buy signal
-                if current_price <= grid_price and len([p for p in self.positions if p['entry_price'] == grid_price]) == 0:
-                    if self.current_balance > self.config['investment_amount']:
-                        self.execute_trade(grid_price, 'buy', timestamp)
+                    # Grid trading logic: Kandidaten aller Level in einem Schritt (leer -> Kauf-, belegt -> Verkaufsbedingung),
+                    # danach nur diese Level in Grid-Reihenfolge mit der bisherigen Prüfung abarbeiten.
+                    # Reicht der Kontostand zu Beginn des Bars nicht für eine Order, entfallen alle Kauf-Level dieses Bars
+                    can_buy = self.current_balance > invest
+                    if can_buy:
+                        candidates = np.flatnonzero(np.where(grid_empty, current_price <= grid_levels, current_price >= grid_levels))
+                    else:
+                        candidates = np.flatnonzero(~grid_empty & (current_price >= grid_levels))
+                    for gid in candidates.tolist():
+                        grid_price = grid_prices[gid]
+                        at_level = grid_by_id[gid]
+                        # Buy signal
+                        if can_buy and current_price <= grid_price and not at_level:
+                            if self.current_balance > invest:
+                                execute_trade(grid_price, 'buy', timestamp)
                 
-                # Sell signal
-                elif current_price >= grid_price:
-                    for position in self.positions:
-                        if position['entry_price'] == grid_price and position['side'] == 'long':
-                            self.close_position(position, grid_price, timestamp)
-                            self.positions.remove(position)
-                            break
+                        # Sell signal
+                        elif current_price >= grid_price and at_level:
+                            for position in at_level:
+                                if position['side'] == 'long':
+                                    close_position(position, grid_price, timestamp)
+                                    remove_position(position)
+                                    break
             
-            # Update max/min balance
-            max_balance = max(max_balance, self.current_balance)
-            min_balance = min(min_balance, self.current_balance)
+                    balances[i] = self.current_balance
         
-        # Close remaining positions
-        for position in self.positions:
-            self.close_position(position, current_price, timestamp)
+                # Close remaining positions
+                for position in self.positions:
+                    self.close_position(position, current_price, timestamp)
+        
+        finally:
+            self.backtest_mode = False
+            self._flush_telegram()
         
         # Calculate metrics
         total_return = ((self.current_balance - initial_balance) / initial_balance) * 100
-        max_drawdown = ((max_balance - min_balance) / max_balance) * 100
-        
-        # Berechne Gewinn-Trades aus den Trades
-        win_trades = len([t for t in self.trades if t.get('pnl', 0) > 0])
-        total_trades = len([t for t in self.trades if 'pnl' in t])
+        # Maximaler Drawdown Peak-to-Trough über Start, alle Bars und Endstand
+        history = np.concatenate(([initial_balance], balances, [self.current_balance]))
+        peak = np.maximum.accumulate(history)
+        max_drawdown = float(((peak - history) / peak).max()) * 100
+        
+        # Gewinn-Trades aus den laufenden Zählern von _trades (vollständig, auch wenn self.trades gekappt ist)
+        total_trades = len(self._trades)
+        win_trades = self._trades.wins
         win_rate = (win_trades / total_trades * 100) if total_trades > 0 else 0
         
         results = {
@@ -1731,32 +2221,55 @@ Laufzeit: {elapsed_time:.1f}s
             'trading_fees': self.total_fees - self.funding_fees,
             'funding_fees': self.funding_fees,
             'total_fees': self.total_fees,
+            'stopped_early': stopped_early,
             'runtime_seconds': time.time() - start_time
         }
         
         # Telegram: Backtest Ende
-        end_msg = f"""
-✅ <b>Backtest abgeschlossen!</b>
-
-📊 <b>Endergebnis:</b>
-Start: ${initial_balance:,.2f}
-Ende: ${self.current_balance:,.2f}
-Rendite: {total_return:.2f}%
-PnL: ${self.current_balance - initial_balance:,.2f}
-
-🎯 <b>Trading-Statistiken:</b>
-Trades: {total_trades}
-Gewinnrate: {win_rate:.1f}%
-Liquidierungen: {self.liquidated_positions}
-Max Drawdown: {max_drawdown:.2f}%
-
-⏱️ Laufzeit: {results['runtime_seconds']:.1f} Sekunden
-        """
+        end_msg = _fmt_backtest_end(
+            initial_balance=initial_balance, final_balance=self.current_balance, total_return=total_return,
+            pnl=self.current_balance - initial_balance, total_trades=total_trades, win_rate=win_rate,
+            liquidated=self.liquidated_positions, max_drawdown=max_drawdown, runtime=results['runtime_seconds'])
         self.send_telegram_message(end_msg)
         
         self.logger.info(f"Quick test completed in {results['runtime_seconds']:.1f} seconds!")
         return results
     
+    def _run_backtest_kernel(self, data: pd.DataFrame, abort_drawdown: float = 0.0,
+                             check_every: int = 0) -> Tuple[np.ndarray, bool]:
+        """Backtest-Schleife über _grid_sim.simulate; übernimmt Kontostand, Gebühren und Trades in den Bot,
+        gibt den Kontostand je Bar und ob der Drawdown-Abbruch gegriffen hat zurück"""
+        closes = data['close'].to_numpy(dtype=self.config['backtest_price_dtype'])
+        grid_px = np.asarray(self.grid_prices, dtype=np.float64)
+        while True:
+            balance, total_fees, funding_fees, liquidated, balances, trades, stopped, draws = _grid_sim.simulate(
+                closes, grid_px, self._rand,
+                self.current_balance, float(self.config['investment_amount']), float(self.config['leverage']),
+                self.config['fee_rate'], self.slippage_rate, self.spread_rate,
+                self.config['liquidation_buffer'], self.config['funding_rate'], _FUNDING_EVERY_BARS,
+                float(abort_drawdown), int(check_every))
+            if draws <= len(self._rand):
+                break
+            # Mehr Orders als vorgezogene Slippage-Werte: mit denselben Folgewerten des RNG wie _next_rand neu rechnen
+            self._rand = np.concatenate((self._rand, self._rng.uniform(0.5, 1.5, size=max(draws, len(self._rand)))))
+        self._rand_pos = draws
+        self.current_balance = balance
+        self.total_fees += total_fees
+        self.funding_fees += funding_fees
+        self.liquidated_positions += liquidated
+        timestamps = data['timestamp']
+        for bar, price, size, fee, pnl in trades:
+            self._record_trade({
+                'timestamp': timestamps.iat[int(bar)],
+                'side': 'sell',
+                'price': price,
+                'size': size,
+                'fee': fee,
+                'pnl': pnl,
+                'leverage': self.config['leverage'],
+            })
+        return balances, bool(stopped)
+    
     def generate_report(self, results: dict):
         """Generate detailed performance report"""
         report = f"""
@@ -1853,16 +2366,20 @@ Liquidations: {results['liquidated_positions']}
         self.binance_base_url = "https://api.binance.com"
         self.symbol = "BTCUSDT"
         self.update_interval = 10  # Update every 10 seconds
+        # Eigener Pool für Binance auf der gemeinsamen Session (längster Präfix gewinnt): kurze Retries statt
+        # des Telegram-Backoffs, damit ein Live-Tick nicht sekundenlang an einem Preis-Request hängt
+        self._http.mount(self.binance_base_url, HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=Retry(
+            total=2, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])))
         
     def get_live_price(self) -> Optional[float]:
         """Get current live price from Binance"""
         try:
             url = f"{self.binance_base_url}/api/v3/ticker/price"
             params = {"symbol": self.symbol}
-            response = requests.get(url, params=params, timeout=5)
+            response = self._http.get(url, params=params, timeout=5)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 return float(data['price'])
             else:
                 self.logger.error(f"Binance API error: {response.status_code}")
@@ -1881,20 +2398,19 @@ Liquidations: {results['liquidated_positions']}
                 "interval": "1m",
                 "limit": limit
             }
-            response = requests.get(url, params=params, timeout=5)
+            response = self._http.get(url, params=params, timeout=5)
             
             if response.status_code == 200:
-                data = response.json()
-                df = pd.DataFrame(data, columns=[
-                    'open_time', 'open', 'high', 'low', 'close', 'volume',
-                    'close_time', 'quote_asset_volume', 'number_of_trades',
-                    'taker_buy_base', 'taker_buy_quote', 'ignore'
-                ])
-                
-                # Convert to proper types
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = df[col].astype(float)
-                
+                # Kline-Zeilen einmal als Array; nur die genutzten Spalten je einmal in ihren Typ wandeln
+                rows = np.asarray(orjson.loads(response.content), dtype=object).reshape(-1, 12)
+                df = pd.DataFrame({
+                    'open_time': rows[:, 0].astype(np.int64),
+                    'open': rows[:, 1].astype(np.float64),
+                    'high': rows[:, 2].astype(np.float64),
+                    'low': rows[:, 3].astype(np.float64),
+                    'close': rows[:, 4].astype(np.float64),
+                    'volume': rows[:, 5].astype(np.float64),
+                })
                 df['timestamp'] = pd.to_datetime(df['open_time'], unit='ms')
                 return df
             else:
@@ -1936,7 +2452,7 @@ Liquidations: {results['liquidated_positions']}
 
 💰 <b>Aktueller Status:</b>
 • Aktueller Preis: ${current_price:,.2f}
-• Grid-Bereich: ${min(self.grid_prices):,.2f} - ${max(self.grid_prices):,.2f}
+• Grid-Bereich: ${self._grid_px[0]:,.2f} - ${self._grid_px[-1]:,.2f}
 • Kontostand: ${self.current_balance:,.2f}
 
 ⚙️ <b>Paper Trading Mode aktiv</b>
@@ -1961,10 +2477,9 @@ Liquidations: {results['liquidated_positions']}
         if self.positions:
             current_price = self.get_live_price()
             if current_price:
-                # Kopie der Liste, damit wir während der Iteration entfernen können
-                for position in self.positions[:]:
+                for position in self.positions:
                     self.close_position(position, current_price, datetime.now())  # Einzelmeldung wird in close_position verschickt
-                    self.positions.remove(position)
+                self._clear_positions()
 
         # Detaillierte Übersicht aller realisierten Trades mit Netto-PnL
         trade_details = ""
@@ -1992,7 +2507,7 @@ Liquidations: {results['liquidated_positions']}
 • Start Balance: ${self.start_balance:,.2f}
 • End Balance: ${self.current_balance:,.2f}
 • Gesamt PnL: ${self.current_balance - self.start_balance:+.2f} ({((self.current_balance - self.start_balance) / self.start_balance) * 100:+.2f}%)
-• Total Trades: {len(self.trades)}
+• Total Trades: {len(self._trades)}
 • Liquidierungen: {self.liquidated_positions}
 • Total Fees: ${self.total_fees:,.2f}
 """
@@ -2032,10 +2547,11 @@ Liquidations: {results['liquidated_positions']}
                         klines = self.add_technical_indicators(klines)
                         trend = self.detect_trend(klines, len(klines)-1)
                 # Grid-Levels bestimmen
-                lower_grids = [g for g in self.grid_prices if g <= price]
-                upper_grids = [g for g in self.grid_prices if g >= price]
-                next_lower = max(lower_grids) if lower_grids else None
-                next_upper = min(upper_grids) if upper_grids else None
+                grid_px = self._grid_px
+                lo_idx = np.searchsorted(grid_px, price, side='right')
+                hi_idx = np.searchsorted(grid_px, price, side='left')
+                next_lower = float(grid_px[lo_idx - 1]) if lo_idx > 0 else None
+                next_upper = float(grid_px[hi_idx]) if hi_idx < len(grid_px) else None
                 dist_lower = price - next_lower if next_lower is not None else None
                 dist_upper = next_upper - price if next_upper is not None else None
                 grid_info = f"Aktueller Preis: {price:.2f} | "
@@ -2054,7 +2570,7 @@ Liquidations: {results['liquidated_positions']}
                     self.send_telegram_message(msg)
                 # Korrigierte Grid-Logik: Nur beim echten Grid-Cross handeln
                 if last_price is not None:
-                    for grid_price in self.grid_prices:
+                    for grid_price in self._crossed_levels(last_price, price):
                         grid_abs = abs(grid_price - price)
                         # Buy: Cross von oben nach unten
                         if last_price > grid_price >= price:
@@ -2097,15 +2613,15 @@ Liquidations: {results['liquidated_positions']}
                                 else:  # sell/short
                                     grid_buy_pnl = ((price - grid_price) * position_size * self.config['leverage']) - buy_fee - sell_fee_grid
                                     is_profitable = grid_buy_pnl > 0
-                                if is_profitable and not any(p['entry_price'] == grid_price and p['side'] == ('long' if trade_side == 'buy' else 'short') for p in self.positions):
+                                if is_profitable and not any(p['side'] == ('long' if trade_side == 'buy' else 'short') for p in self._grid_by_id[self._grid_id[grid_price]]):
                                     if len(self.positions) < self.max_open_positions:
                                         self.execute_trade(grid_price, trade_side, timestamp)
                         # Sell: Cross von unten nach oben
                         elif last_price < grid_price <= price:
-                            for position in self.positions:
-                                if position['entry_price'] == grid_price and ((self.config.get('mode', 'long') == 'short' and position['side'] == 'short') or (self.config.get('mode', 'long') == 'long' and position['side'] == 'long') or (self.config.get('mode', 'long') == 'auto')):
+                            for position in self._grid_by_id[self._grid_id[grid_price]]:
+                                if ((self.config.get('mode', 'long') == 'short' and position['side'] == 'short') or (self.config.get('mode', 'long') == 'long' and position['side'] == 'long') or (self.config.get('mode', 'long') == 'auto')):
                                     self.close_position(position, grid_price, timestamp)
-                                    self.positions.remove(position)
+                                    self._remove_position(position)
                                     break
                 last_price = price
                 time.sleep(30)
@@ -2127,10 +2643,7 @@ Liquidations: {results['liquidated_positions']}
                 lev = pos['leverage']
                 buy_fee = pos.get('buy_fee', entry * size * self.config['fee_rate'])
                 sell_fee = size * self.current_price * self.config['fee_rate']
-                if pos['side'] == 'long':
-                    brutto = (self.current_price - entry) * size * lev
-                else:
-                    brutto = (entry - self.current_price) * size * lev
+                brutto = pos['sign'] * (self.current_price - entry) * size * lev
                 netto = brutto - buy_fee - sell_fee
                 total_netto += netto
                 msg += (f"<b>Position {i}</b> | Einstieg: {entry:.2f} | Größe: {size:.6f} | Hebel: {lev}x\n"
@@ -2145,7 +2658,8 @@ Liquidations: {results['liquidated_positions']}
 
     def cmd_reset_stats(self, chat_id: str):
         """Reset statistics for a new run"""
-        self.trades = []
+        self.trades = deque(maxlen=self.config['trade_history_cap'])
+        self._trades = _Trades()
         self.total_fees = 0.0
         self.liquidated_positions = 0
         self.start_balance = self.current_balance
@@ -2167,6 +2681,78 @@ Liquidations: {results['liquidated_positions']}
         else:
             self.send_telegram_message(f"Aktueller Reporting-Modus: <b>{self.reporting_mode.upper()}</b>\nNutze /reporting detailliert oder /reporting normal zum Umschalten.")
 
+    def cmd_set(self, chat_id: str, args: List[str]):
+        """Setzt einen Parameter per Nummer, z.B. /set 3:20"""
+        if not args:
+            self.send_telegram_message("Verwendung: /set Nummer:Wert (siehe /paraminfo)")
+            return
+        try:
+            # Robust: Entferne alle Leerzeichen um Nummer und Wert
+            num_val = args[0].replace(' ', '')
+            num, val = num_val.split(':')
+            num = int(num.strip())
+            val = val.strip()
+            if num == 25:
+                grid_size = float(val)
+                self.config['grid_size'] = grid_size
+                self.config['grid_mode'] = 'static'
+                self.grid_prices = self.calculate_grid_prices()
+                self.send_telegram_message(f"Gridspacing wurde auf {grid_size} USDT gesetzt. Grid ist jetzt statisch.")
+                self.send_telegram_message(f"Neues Grid: {self.config['grid_count']} x {grid_size} USDT von {self.config['grid_lower_price']:.2f} bis {self.config['grid_upper_price']:.2f}")
+            elif num == 3:
+                grid_count = int(val)
+                self.config['grid_count'] = grid_count
+                self.grid_prices = self.calculate_grid_prices()
+                self.send_telegram_message(f"Grid-Anzahl wurde auf {grid_count} gesetzt. Grid wurde neu berechnet.")
+                self.send_telegram_message(f"Neues Grid: {grid_count} x {self.config.get('grid_size','auto')} USDT von {self.config['grid_lower_price']:.2f} bis {self.config['grid_upper_price']:.2f}")
+            elif num == 24 and val.lower() == 'auto':
+                self.config['grid_mode'] = 'auto'
+                self.config['grid_size'] = None
+                self.grid_prices = self.calculate_grid_prices()
+                self.send_telegram_message('Grid-Modus wieder auf AUTO gestellt. Grid wird automatisch berechnet.')
+            elif num in self.CONFIG_PARAMS:
+                key, _ = self.CONFIG_PARAMS[num]
+                old_val = self.config.get(key, None)
+                # Typkonvertierung
+                if isinstance(self.config.get(key, None), bool):
+                    self.config[key] = bool(int(val))
+                elif isinstance(self.config.get(key, None), int):
+                    self.config[key] = int(val)
+                elif isinstance(self.config.get(key, None), float):
+                    self.config[key] = float(val)
+                else:
+                    self.config[key] = val
+                self.send_telegram_message(f"Parameter {num} ({key}) wurde auf {val} gesetzt.")
+            else:
+                self.send_telegram_message(f"Unbekannte Parameternummer: {num}")
+        except Exception as e:
+            self.send_telegram_message(f"Fehler beim Setzen: {e}")
+
+    def cmd_paraminfo(self, chat_id: str):
+        """Listet alle per /set änderbaren Parameter"""
+        param_msg = "Verfügbare Parameter für /set:\n"
+        for num, (key, desc) in self.CONFIG_PARAMS.items():
+            param_msg += f"{num}: {key}  // {desc}\n"
+        self.send_telegram_message(param_msg, force_plaintext=True)
+
+    def cmd_export_performance(self, chat_id: str):
+        """Exportiert die Trades als Excel und sendet die Datei"""
+        if self.export_performance_to_excel():
+            if self.send_excel_via_telegram(chat_id):
+                self.send_telegram_message("Excel-Export wurde gesendet.")
+            else:
+                self.send_telegram_message("Fehler beim Senden der Excel-Datei.")
+        else:
+            self.send_telegram_message("Keine Trades zum Exportieren vorhanden.")
+
+    def cmd_mode(self, chat_id: str, args: List[str]):
+        """Setzt den Handelsmodus (auto/long/short)"""
+        mode = args[0].lower() if args else 'auto'
+        if mode not in _MODE_MESSAGES:
+            mode = 'auto'
+        self.config['mode'] = mode
+        self.send_telegram_message(_MODE_MESSAGES[mode])
+
     def cmd_version(self, chat_id: str):
         import os, datetime
         msg = ""
@@ -2200,7 +2786,7 @@ Liquidations: {results['liquidated_positions']}
         with open(filename, 'rb') as f:
             files = {'document': f}
             data = {'chat_id': chat_id}
-            response = requests.post(url, files=files, data=data)
+            response = self._http.post(url, files=files, data=data)
         return response.status_code == 200
 
     def cmd_all(self, chat_id: str):
@@ -2229,7 +2815,7 @@ Liquidations: {results['liquidated_positions']}
                     msg += f"{i}. {pos['side'].upper()} | Einstieg: {pos['entry_price']:.2f} | Größe: {pos['size']:.6f} | Hebel: {pos['leverage']}x\n"
             if self.trades:
                 msg += f"\n<b>Letzte Trades:</b>\n"
-                for trade in self.trades[-5:]:
+                for trade in _last(self.trades, 5):
                     emoji = '🟢' if trade['pnl'] > 0 else '🔴'
                     msg += f"{emoji} {trade['side'].upper()}: {trade['pnl']:.2f} USDT | Preis: {trade['price']:.2f} | Größe: {trade['size']:.4f}\n"
             self.send_telegram_message(msg)
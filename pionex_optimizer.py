@@ -1,16 +1,117 @@
-import json
+import atexit
+import hashlib
+import os
+import queue
+import threading
 import time
 import logging
+import logging.handlers
+import multiprocessing
+import random
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Tuple
-import itertools
-from pionex_futures_grid_bot import PionexFuturesGridBot
+import numpy as np
+import orjson
+import requests
+from pionex_futures_grid_bot import PRICE_DTYPE, PionexFuturesGridBot, price_records, read_price_csv
+
+# One row per completed test, filled alongside all_results for the final statistics
+_RESULT_DTYPE = np.dtype([
+    ('total_return', 'f8'), ('final_balance', 'f8'), ('max_drawdown', 'f8'),
+    ('win_rate', 'f8'), ('total_trades', 'i4'),
+])
+
+# Part of every cache key; bump when backtest results change for the same config and data
+_CACHE_VERSION = b"2"
+
+# Base config and price data of a worker process, set once by _init_worker so tasks only carry their parameters
+_worker_base_config = None
+_worker_shm = None
+_worker_prices = None
+
+
+def _init_worker(base_config: Dict, shm_name: str, n_prices: int, log_queue):
+    """Pool initializer: keep the base config, attach the shared price array (zero-copy) and log via the parent"""
+    global _worker_base_config, _worker_shm, _worker_prices
+    # Only a QueueHandler: the bot's basicConfig becomes a no-op and all records go to the parent's listener
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+    _worker_base_config = base_config
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_prices = np.ndarray((n_prices,), dtype=PRICE_DTYPE, buffer=_worker_shm.buf)
+
+
+def _run_one(params: Dict, test_id: int, cache_file: str = None, base_config: Dict = None,
+             prices: np.ndarray = None) -> Tuple[Dict, Dict]:
+    """Run a single backtest; module-level so worker processes can pickle it"""
+    if base_config is None:
+        base_config, prices = _worker_base_config, _worker_prices
+    test_config = {**base_config, **params}
+    if cache_file and os.path.exists(cache_file):
+        # Same config on the same data was already evaluated
+        with open(cache_file, 'rb') as f:
+            results = orjson.loads(f.read())
+    else:
+        bot = PionexFuturesGridBot(config=test_config, prices=prices)
+        try:
+            # Abandon clearly losing parameter sets early instead of running them to the end
+            results = bot.run_backtest(abort_drawdown=test_config.get('optimizer_abort_drawdown'))
+        finally:
+            bot.close()
+        if cache_file:
+            # Write via temp file + rename so parallel workers never read a partial file
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(results, default=str, option=orjson.OPT_SERIALIZE_NUMPY))
+            os.replace(tmp_file, cache_file)
+    
+    # Add parameter info to results
+    results['parameters'] = params
+    results['test_id'] = test_id
+    
+    return results, params
+
 
 class PionexOptimizer:
     """
     Optimizer for Pionex Futures Grid Bot parameters
     """
     
+    # Report templates: constant parts are built once, only the numbers are filled in per call
+    _PROGRESS_HEADER = ("=" * 50 + "\nPIONEX OPTIMIZER - PROGRESS REPORT\n" + "=" * 50 + "\n"
+                        "Tests completed: {tests}\nElapsed time: {hours:.1f} hours\n\n")
+    _PROGRESS_BEST = ("BEST RESULT SO FAR:\n" + "-" * 25 + "\n"
+                      "Total Return: {total_return:.2%}\n"
+                      "Final Balance: ${final_balance:,.2f}\n"
+                      "Max Drawdown: {max_drawdown:.2%}\n"
+                      "Win Rate: {win_rate:.2f}%\n"
+                      "Total Trades: {total_trades}\n\n"
+                      "BEST PARAMETERS:\n" + "-" * 25 + "\n{params}\n")
+    _PROGRESS_FOOTER = "=" * 50
+    _FINAL_HEADER = ("=" * 60 + "\nPIONEX FUTURES GRID - OPTIMIZATION FINAL REPORT\n" + "=" * 60 + "\n"
+                     "Total tests: {tests}\nOptimization time: {hours:.1f} hours\n\n"
+                     "TOP 10 RESULTS:\n" + "-" * 30 + "\n")
+    _FINAL_TOP_LINE = ("{rank}. Return: {total_return:.2%} | Balance: ${final_balance:,.2f} | "
+                       "Drawdown: {max_drawdown:.2%} | Trades: {total_trades}")
+    _FINAL_BODY = ("\n\nBEST RESULT DETAILS:\n" + "-" * 30 + "\n"
+                   "Total Return: {total_return:.2%}\n"
+                   "Final Balance: ${final_balance:,.2f}\n"
+                   "Max Drawdown: {max_drawdown:.2%}\n"
+                   "Win Rate: {win_rate:.2f}%\n"
+                   "Total Trades: {total_trades}\n"
+                   "Liquidated Positions: {liquidated_positions}\n\n"
+                   "BEST PARAMETERS:\n" + "-" * 30 + "\n{params}\n\n"
+                   "STATISTICS:\n" + "-" * 30 + "\n"
+                   "Average Return: {mean:.2%}\n"
+                   "Median Return: {median:.2%}\n"
+                   "Best Return: {best:.2%}\n"
+                   "Worst Return: {worst:.2%}\n"
+                   "Standard Deviation: {std:.2%}\n\n" + "=" * 60)
+    
     def __init__(self, base_config_file: str = "pionex_config.json"):
         self.base_config = self.load_config(base_config_file)
         self.setup_logging()
@@ -19,25 +120,49 @@ class PionexOptimizer:
         # Optimization state
         self.best_result = None
         self.best_params = None
+        self._last_logged_best = float('-inf')
         self.all_results = []
+        self._results_array = np.empty(64, dtype=_RESULT_DTYPE)  # row i = all_results[i]
         self.test_count = 0
         self.start_time = time.time()
+        # Every completed test is appended as one line; the file is opened on the first result
+        self.progress_file = f"pionex_optimization_progress_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self._progress_fh = None
+        
+        # Result cache shared by all workers (None disables it)
+        self.cache_dir = self.base_config.get('optimizer_cache_dir', 'optimizer_cache')
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.data_fingerprint = self.get_data_fingerprint()
+        self._prices = None  # Price data, parsed once on first use (get_prices)
+        # Stop a backtest once its drawdown exceeds this fraction (None runs every test to the end)
+        self.base_config.setdefault('optimizer_abort_drawdown', 0.3)
+        # Backtests run on the compiled kernel (_grid_sim.simulate, including the early abort);
+        # optimizer_backtest_engine = "python" brings back the interpreted loop
+        self.base_config['backtest_engine'] = self.base_config.get('optimizer_backtest_engine', 'numba')
+        # Serialized once: cache keys only add the per-test parameters
+        self._cache_key_base = (_CACHE_VERSION + orjson.dumps(self.base_config, default=str, option=orjson.OPT_SORT_KEYS)
+                                + self.data_fingerprint.encode())
         
     def load_config(self, config_file: str) -> Dict:
         """Load base configuration"""
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(config_file, 'rb') as f:
+            return orjson.loads(f.read())
     
     def setup_logging(self):
-        """Setup logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('pionex_optimizer.log'),
-                logging.StreamHandler()
-            ]
-        )
+        """Setup logging: records are queued and written to file/console by a listener thread"""
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        handlers = [logging.FileHandler('pionex_optimizer.log'), logging.StreamHandler()]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        # Worker processes log into the same queue (see _init_worker)
+        self.log_queue = multiprocessing.get_context("spawn").Queue(-1)
+        self._log_listener = logging.handlers.QueueListener(self.log_queue, *handlers)
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
+        root = logging.getLogger()
+        root.handlers[:] = [logging.handlers.QueueHandler(self.log_queue)]
+        root.setLevel(logging.INFO)
         self.logger = logging.getLogger(__name__)
     
     def setup_telegram(self):
@@ -45,27 +170,59 @@ class PionexOptimizer:
         self.telegram_token = self.base_config['telegram_token']
         self.telegram_chat_id = self.base_config['telegram_chat_id']
         self.telegram_url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
+        # Messages are sent by a background thread over one pooled session, so the optimizer never waits on Telegram
+        self._http = requests.Session()
+        self._tg_queue = queue.Queue()
+        threading.Thread(target=self._tg_worker, daemon=True).start()
+        atexit.register(self.flush_telegram_messages)
     
     def send_telegram_message(self, message: str):
-        """Send Telegram message"""
-        try:
-            if self.telegram_token != "YOUR_TELEGRAM_TOKEN":
-                import requests
+        """Queue Telegram message (non-blocking)"""
+        if self.telegram_token != "YOUR_TELEGRAM_TOKEN":
+            self._tg_queue.put_nowait(message)
+    
+    def flush_telegram_messages(self, timeout: float = 10.0):
+        """Wait until all queued Telegram messages are sent"""
+        q = self._tg_queue
+        with q.all_tasks_done:
+            q.all_tasks_done.wait_for(lambda: q.unfinished_tasks == 0, timeout)
+    
+    def _tg_worker(self):
+        """Background sender: drain the queue, drop duplicate messages and send the rest as one batch (< 3500 chars)"""
+        q = self._tg_queue
+        pending = None
+        while True:
+            messages = [pending or q.get()]
+            pending = None
+            size = len(messages[0])
+            while size < 3500:
+                try:
+                    message = q.get_nowait()
+                except queue.Empty:
+                    break
+                if size + len(message) > 3500:
+                    pending = message  # sent with the next batch
+                    break
+                messages.append(message)
+                size += len(message)
+            try:
                 payload = {
                     'chat_id': self.telegram_chat_id,
-                    'text': message,
+                    'text': "\n\n".join(dict.fromkeys(m.strip() for m in messages)),
                     'parse_mode': 'HTML'
                 }
-                response = requests.post(self.telegram_url, data=payload, timeout=10)
+                response = self._http.post(self.telegram_url, data=payload, timeout=10)
                 if response.status_code != 200:
                     self.logger.warning(f"Telegram failed: {response.text}")
-        except Exception as e:
-            self.logger.error(f"Telegram error: {e}")
+            except Exception as e:
+                self.logger.error(f"Telegram error: {e}")
+            finally:
+                for _ in messages:
+                    q.task_done()
     
-    def generate_parameter_combinations(self) -> List[Dict]:
-        """Generate parameter combinations to test"""
-        # Define parameter ranges
-        param_ranges = {
+    def get_parameter_ranges(self) -> Dict[str, List]:
+        """Parameter ranges shared by grid search and genetic search"""
+        return {
             'leverage': [2, 3, 5],
             'grid_count': [10, 15, 20, 25],
             'investment_amount': [500, 1000, 1500],
@@ -73,118 +230,138 @@ class PionexOptimizer:
             'take_profit_pct': [0.08, 0.10, 0.12],
             'mode': ['long', 'short']
         }
+    
+    def get_parameter_grid(self) -> np.ndarray:
+        """All combinations as rows of indices into the parameter ranges (same order as itertools.product)"""
+        sizes = [len(v) for v in self.get_parameter_ranges().values()]
+        return np.stack(np.meshgrid(*(np.arange(n) for n in sizes), indexing='ij'), axis=-1).reshape(-1, len(sizes))
+    
+    def decode_parameters(self, indices) -> Dict:
+        """Parameter dict for one row of index values"""
+        return {key: values[int(i)] for (key, values), i in zip(self.get_parameter_ranges().items(), indices)}
+    
+    def valid_parameter_mask(self, grid: np.ndarray) -> np.ndarray:
+        """True for index rows worth a backtest: stop loss below take profit and notional within optimizer_max_notional"""
+        ranges = self.get_parameter_ranges()
+        keys = list(ranges)
         
-        # Generate all combinations
-        keys = param_ranges.keys()
-        combinations = []
-        
-        for values in itertools.product(*param_ranges.values()):
-            params = dict(zip(keys, values))
-            combinations.append(params)
+        def column(name):
+            return np.asarray(ranges[name])[grid[:, keys.index(name)]]
         
-        self.logger.info(f"Generated {len(combinations)} parameter combinations")
-        return combinations
+        mask = column('stop_loss_pct') < column('take_profit_pct')
+        max_notional = self.base_config.get('optimizer_max_notional')
+        if max_notional:
+            mask &= column('leverage') * column('investment_amount') <= max_notional
+        return mask
+    
+    def generate_parameter_combinations(self, max_tests: int = None) -> List[Dict]:
+        """Generate parameter combinations to test (dicts are only built for the rows that will run)"""
+        grid = self.get_parameter_grid()
+        valid = self.valid_parameter_mask(grid)
+        pruned = len(grid) - int(valid.sum())
+        grid = grid[valid]
+        self.logger.info(f"Generated {len(grid)} parameter combinations ({pruned} impossible ones pruned)")
+        return [self.decode_parameters(row) for row in grid[:max_tests or None]]
     
     def create_test_config(self, params: Dict) -> Dict:
         """Create test configuration with given parameters"""
-        config = self.base_config.copy()
-        config.update(params)
-        return config
+        return {**self.base_config, **params}
     
-    def save_test_config(self, config: Dict, test_id: int) -> str:
-        """Save test configuration to temporary file"""
-        filename = f"temp_config_{test_id}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
-        return filename
+    def get_data_fingerprint(self) -> str:
+        """Identify the price data by path, size and modification time"""
+        data_file = self.base_config.get('data_file', '')
+        try:
+            stat = os.stat(data_file)
+            return f"{os.path.abspath(data_file)}:{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            return data_file
+    
+    def get_prices(self) -> np.ndarray:
+        """Price data of data_file as a PRICE_DTYPE array, read once for all backtests"""
+        if self._prices is None:
+            self._prices = price_records(read_price_csv(self.base_config['data_file']))
+        return self._prices
+    
+    def get_cache_file(self, params: Dict) -> str:
+        """Cache file for a parameter set on the current base config and price data"""
+        if not self.cache_dir:
+            return None
+        key = hashlib.blake2b(
+            self._cache_key_base + orjson.dumps(params, default=str, option=orjson.OPT_SORT_KEYS),
+            digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
     
     def run_single_test(self, params: Dict) -> Tuple[Dict, Dict]:
         """Run single backtest with given parameters"""
         self.test_count += 1
-        
-        # Create test config
-        test_config = self.create_test_config(params)
-        config_file = self.save_test_config(test_config, self.test_count)
-        
         try:
-            # Run backtest
-            bot = PionexFuturesGridBot(config_file)
-            results = bot.run_backtest()
-            
-            # Add parameter info to results
-            results['parameters'] = params
-            results['test_id'] = self.test_count
-            
-            return results, params
-            
+            return _run_one(params, self.test_count, self.get_cache_file(params), self.base_config, self.get_prices())
         except Exception as e:
             self.logger.error(f"Test {self.test_count} failed: {e}")
             return None, params
-        finally:
-            # Clean up temp config file
-            import os
-            if os.path.exists(config_file):
-                os.remove(config_file)
+    
+    def add_result(self, results: Dict):
+        """Append a completed test to all_results and the NumPy result rows"""
+        n = len(self.all_results)
+        if n == len(self._results_array):
+            self._results_array = np.concatenate([self._results_array, np.empty_like(self._results_array)])
+        self._results_array[n] = tuple(results[name] for name in _RESULT_DTYPE.names)
+        self.all_results.append(results)
+        if self._progress_fh is None:
+            self._progress_fh = open(self.progress_file, 'ab')
+        self._progress_fh.write(orjson.dumps(results, default=str,
+                                             option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
     
     def update_best_result(self, results: Dict, params: Dict):
         """Update best result if current is better"""
         if results is None:
             return
         
-        if self.best_result is None or results['total_return'] > self.best_result['total_return']:
+        # Ties and float noise (e.g. the same cached result again) do not count as a new best
+        if self.best_result is None or results['total_return'] > self.best_result['total_return'] + 1e-9:
             self.best_result = results
             self.best_params = params
+            self.save_progress()
             
-            self.logger.info(f"New best result: {results['total_return']*100:.2f}% return")
-            self.logger.info(f"Parameters: {params}")
+            # Only log clear improvements (more than 0.005 total_return above the last logged best)
+            if results['total_return'] > self._last_logged_best + 0.005 and self.logger.isEnabledFor(logging.INFO):
+                self._last_logged_best = results['total_return']
+                self.logger.info(f"New best result: {results['total_return']*100:.2f}% return")
+                self.logger.info(f"Parameters: {params}")
     
     def generate_progress_report(self) -> str:
         """Generate progress report"""
-        elapsed_time = time.time() - self.start_time
-        elapsed_hours = elapsed_time / 3600
-        
-        report = []
-        report.append("=" * 50)
-        report.append("PIONEX OPTIMIZER - PROGRESS REPORT")
-        report.append("=" * 50)
-        report.append(f"Tests completed: {self.test_count}")
-        report.append(f"Elapsed time: {elapsed_hours:.1f} hours")
-        report.append("")
-        
+        report = self._PROGRESS_HEADER.format(tests=self.test_count,
+                                              hours=(time.time() - self.start_time) / 3600)
         if self.best_result:
-            report.append("BEST RESULT SO FAR:")
-            report.append("-" * 25)
-            report.append(f"Total Return: {self.best_result['total_return']*100:.2f}%")
-            report.append(f"Final Balance: ${self.best_result['final_balance']:,.2f}")
-            report.append(f"Max Drawdown: {self.best_result['max_drawdown']*100:.2f}%")
-            report.append(f"Win Rate: {self.best_result['win_rate']:.2f}%")
-            report.append(f"Total Trades: {self.best_result['total_trades']}")
-            report.append("")
-            report.append("BEST PARAMETERS:")
-            report.append("-" * 25)
-            for key, value in self.best_params.items():
-                report.append(f"{key}: {value}")
-        
-        report.append("=" * 50)
-        
-        return "\n".join(report)
+            report += self._PROGRESS_BEST.format(**self.best_result, params=self._format_params())
+        return report + self._PROGRESS_FOOTER
+    
+    def _format_params(self) -> str:
+        """Best parameters as 'key: value' lines"""
+        return "\n".join(f"{key}: {value}" for key, value in self.best_params.items())
     
     def save_progress(self):
-        """Save current progress to file"""
+        """Save current progress: flush the results file and rewrite the small best-result summary"""
+        if self._progress_fh is not None:
+            self._progress_fh.flush()
+        
         progress_data = {
             'timestamp': datetime.now().isoformat(),
             'test_count': self.test_count,
             'elapsed_time': time.time() - self.start_time,
             'best_result': self.best_result,
             'best_params': self.best_params,
-            'all_results': self.all_results
+            'results_file': self.progress_file
         }
         
-        filename = f"pionex_optimization_progress_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, indent=2, default=str)
+        # Write via temp file + rename so the summary is never left half-written
+        filename = "pionex_optimization_best.json"
+        with open(filename + ".tmp", 'wb') as f:
+            f.write(orjson.dumps(progress_data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        os.replace(filename + ".tmp", filename)
         
-        self.logger.info(f"Progress saved to {filename}")
+        self.logger.info(f"Progress saved to {self.progress_file} / {filename}")
     
     def send_telegram_progress(self):
         """Send progress update via Telegram"""
@@ -212,38 +389,135 @@ class PionexOptimizer:
         self.send_telegram_message("🚀 Pionex Optimizer gestartet!")
         
         # Generate parameter combinations
-        combinations = self.generate_parameter_combinations()
-        
-        if max_tests:
-            combinations = combinations[:max_tests]
+        combinations = self.generate_parameter_combinations(max_tests)
         
         self.logger.info(f"Will test {len(combinations)} combinations")
         
-        # Test each combination
-        for i, params in enumerate(combinations):
-            self.logger.info(f"Testing combination {i+1}/{len(combinations)}: {params}")
-            
-            results, _ = self.run_single_test(params)
+        # Test combinations in parallel; each backtest is independent
+        with self.create_pool() as ex:
+            self.evaluate_parallel(ex, combinations)
+        
+        # Final report
+        self.save_progress()
+        self.generate_final_report()
+        
+        self.logger.info("Optimization completed!")
+        self.send_telegram_message("✅ Pionex Optimizer abgeschlossen!")
+        self.flush_telegram_messages()
+    
+    @contextmanager
+    def create_pool(self):
+        """Worker pool for backtests (spawn: workers do not inherit the loaded parent); the price
+        data is placed in shared memory once and attached by every worker"""
+        prices = self.get_prices()
+        shm = shared_memory.SharedMemory(create=True, size=max(1, prices.nbytes))
+        try:
+            np.ndarray(prices.shape, dtype=PRICE_DTYPE, buffer=shm.buf)[:] = prices
+            workers = self.base_config.get('optimizer_workers') or os.cpu_count()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(self.base_config, shm.name, len(prices), self.log_queue)) as ex:
+                yield ex
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    def evaluate_parallel(self, ex: ProcessPoolExecutor, param_list: List[Dict]) -> List[Dict]:
+        """Run backtests on the pool; results are aggregated here in the main process as they complete"""
+        futures = {}
+        for i, params in enumerate(param_list):
+            self.logger.info(f"Testing combination {i+1}/{len(param_list)}: {params}")
+            test_id = self.test_count + i + 1  # unique across several calls (genetic generations)
+            futures[ex.submit(_run_one, params, test_id, self.get_cache_file(params))] = (i, test_id, params)
+        
+        results_list = [None] * len(param_list)
+        for done, fut in enumerate(as_completed(futures), 1):
+            i, test_id, params = futures[fut]
+            self.test_count += 1
+            try:
+                results, _ = fut.result()
+            except Exception as e:
+                self.logger.error(f"Test {test_id} failed: {e}")
+                results = None
             
             if results:
-                self.all_results.append(results)
+                self.add_result(results)
                 self.update_best_result(results, params)
+            results_list[i] = results
             
             # Progress reporting
-            if (i + 1) % self.base_config.get('report_interval', 10) == 0:
-                print(self.generate_progress_report())
+            if done % self.base_config.get('report_interval', 10) == 0:
+                if self.best_result is not None:
+                    print(self.generate_progress_report())
                 self.save_progress()
                 self.send_telegram_progress()
             
             # Save interval
-            if (i + 1) % self.base_config.get('save_interval', 15) == 0:
+            if done % self.base_config.get('save_interval', 15) == 0:
                 self.save_progress()
         
+        return results_list
+    
+    def run_genetic(self, pop_size: int = 20, generations: int = 10, p_c: float = 0.5, p_m: float = 0.3,
+                    seed: int = None):
+        """Genetic search over the same parameter ranges as the grid search (fitness = total_return)"""
+        self.logger.info("Starting Pionex Futures Grid Genetic Optimization...")
+        self.send_telegram_message("🚀 Pionex Optimizer (genetisch) gestartet!")
+        
+        # Individual = tuple of indices into each parameter range
+        sizes = [len(v) for v in self.get_parameter_ranges().values()]
+        rng = random.Random(seed)
+        decode = self.decode_parameters
+        
+        def random_individual():
+            return tuple(rng.randrange(n) for n in sizes)
+        
+        fitness = {}  # individual -> total_return; revisited individuals are not re-run
+        
+        def evaluate(individuals):
+            new = list(dict.fromkeys(ind for ind in individuals if ind not in fitness))
+            if new:
+                # Impossible combinations get the worst fitness without a backtest
+                valid = self.valid_parameter_mask(np.array(new))
+                for ind in (ind for ind, ok in zip(new, valid) if not ok):
+                    fitness[ind] = float('-inf')
+                new = [ind for ind, ok in zip(new, valid) if ok]
+                if len(new) < len(valid):
+                    self.logger.info(f"Pruned {len(valid) - len(new)} impossible individuals")
+            if new:
+                for ind, results in zip(new, self.evaluate_parallel(ex, [decode(ind) for ind in new])):
+                    fitness[ind] = results['total_return'] if results else float('-inf')
+        
+        def tournament(population, k=2):
+            return max(rng.sample(population, k), key=fitness.__getitem__)
+        
+        with self.create_pool() as ex:
+            population = [random_individual() for _ in range(pop_size)]
+            evaluate(population)
+            
+            for generation in range(generations):
+                offspring = []
+                while len(offspring) < pop_size:
+                    a, b = tournament(population), tournament(population)
+                    # Uniform crossover
+                    child = tuple(ga if rng.random() >= p_c else gb for ga, gb in zip(a, b))
+                    # Per-gene mutation: resample from that gene's range
+                    child = tuple(rng.randrange(n) if rng.random() < p_m else g for g, n in zip(child, sizes))
+                    offspring.append(child)
+                evaluate(offspring)
+                
+                # Best offspring replace the worst individuals
+                population = sorted(set(population) | set(offspring), key=fitness.__getitem__, reverse=True)[:pop_size]
+                self.logger.info(f"Generation {generation + 1}/{generations}: best return "
+                                 f"{fitness[population[0]]*100:.2f}% ({len(fitness)} evaluated)")
+        
         # Final report
+        self.save_progress()
         self.generate_final_report()
         
-        self.logger.info("Optimization completed!")
-        self.send_telegram_message("✅ Pionex Optimizer abgeschlossen!")
+        self.logger.info("Genetic optimization completed!")
+        self.send_telegram_message("✅ Pionex Optimizer (genetisch) abgeschlossen!")
+        self.flush_telegram_messages()
     
     def generate_final_report(self):
         """Generate final optimization report"""
@@ -251,60 +525,23 @@ class PionexOptimizer:
             self.logger.warning("No successful tests completed")
             return
         
-        # Sort all results by return
-        sorted_results = sorted(self.all_results, key=lambda x: x['total_return'], reverse=True)
+        # Top 10 by return: partial selection, only those 10 get sorted
+        returns = self._results_array['total_return'][:len(self.all_results)]
+        top_n = min(10, len(returns))
+        top = np.argpartition(returns, -top_n)[-top_n:]
+        top = top[np.argsort(returns[top])[::-1]]
         
         # Generate report
-        report = []
-        report.append("=" * 60)
-        report.append("PIONEX FUTURES GRID - OPTIMIZATION FINAL REPORT")
-        report.append("=" * 60)
-        report.append(f"Total tests: {len(self.all_results)}")
-        report.append(f"Optimization time: {(time.time() - self.start_time)/3600:.1f} hours")
-        report.append("")
-        
-        # Top 10 results
-        report.append("TOP 10 RESULTS:")
-        report.append("-" * 30)
-        for i, result in enumerate(sorted_results[:10]):
-            report.append(f"{i+1}. Return: {result['total_return']*100:.2f}% | "
-                         f"Balance: ${result['final_balance']:,.2f} | "
-                         f"Drawdown: {result['max_drawdown']*100:.2f}% | "
-                         f"Trades: {result['total_trades']}")
-        report.append("")
-        
-        # Best result details
-        report.append("BEST RESULT DETAILS:")
-        report.append("-" * 30)
-        report.append(f"Total Return: {self.best_result['total_return']*100:.2f}%")
-        report.append(f"Final Balance: ${self.best_result['final_balance']:,.2f}")
-        report.append(f"Max Drawdown: {self.best_result['max_drawdown']*100:.2f}%")
-        report.append(f"Win Rate: {self.best_result['win_rate']:.2f}%")
-        report.append(f"Total Trades: {self.best_result['total_trades']}")
-        report.append(f"Liquidated Positions: {self.best_result['liquidated_positions']}")
-        report.append("")
-        
-        report.append("BEST PARAMETERS:")
-        report.append("-" * 30)
-        for key, value in self.best_params.items():
-            report.append(f"{key}: {value}")
-        report.append("")
-        
-        # Statistics
-        returns = [r['total_return'] for r in self.all_results]
-        report.append("STATISTICS:")
-        report.append("-" * 30)
-        report.append(f"Average Return: {np.mean(returns)*100:.2f}%")
-        report.append(f"Median Return: {np.median(returns)*100:.2f}%")
-        report.append(f"Best Return: {max(returns)*100:.2f}%")
-        report.append(f"Worst Return: {min(returns)*100:.2f}%")
-        report.append(f"Standard Deviation: {np.std(returns)*100:.2f}%")
-        report.append("")
-        
-        report.append("=" * 60)
+        top_lines = "\n".join(self._FINAL_TOP_LINE.format(rank=i + 1, **self.all_results[j])
+                               for i, j in enumerate(top))
+        stats = dict(mean=returns.mean(), median=np.median(returns), best=returns.max(),
+                     worst=returns.min(), std=returns.std())
+        report_text = (self._FINAL_HEADER.format(tests=len(self.all_results),
+                                                 hours=(time.time() - self.start_time) / 3600)
+                       + top_lines
+                       + self._FINAL_BODY.format(**self.best_result, **stats, params=self._format_params()))
         
         # Save report
-        report_text = "\n".join(report)
         with open("pionex_optimization_final_report.txt", 'w', encoding='utf-8') as f:
             f.write(report_text)
         
@@ -312,15 +549,13 @@ class PionexOptimizer:
         
         # Save best config
         best_config = self.create_test_config(self.best_params)
-        with open("pionex_best_config.json", 'w', encoding='utf-8') as f:
-            json.dump(best_config, f, indent=2)
+        with open("pionex_best_config.json", 'wb') as f:
+            f.write(orjson.dumps(best_config, option=orjson.OPT_INDENT_2))
         
         self.logger.info("Final report saved")
 
 def main():
     """Main function"""
-    import numpy as np
-    
     optimizer = PionexOptimizer()
     
     # Run optimization with limited tests for quick testing
@@ -7,18 +7,48 @@ Simple script to run the bot in different modes
 import argparse
 import json
 import sys
-import time
 import threading
+import time
+from functools import wraps
 from pionex_futures_grid_bot import PionexFuturesGridBot
 from pionex_optimizer import PionexOptimizer
 from flask import Flask, request, jsonify
 from datetime import datetime
 
+try:
+    from waitress import serve  # Mehrthreadiger Produktionsserver, optional
+except ImportError:
+    serve = None
+
 app = Flask(__name__)
 
 # Global variables for health check
 bot = None
 start_time = None
+# Hält den Hauptthread im Live-Modus ohne Polling am Leben; set() beendet das Warten
+stop_event = threading.Event()
+
+# Prometheus-Metriken: HELP/TYPE-Zeilen ändern sich nie und werden nur einmal gebaut
+METRIC_NAMES = ('pionex_bot_running', 'pionex_bot_uptime_seconds', 'pionex_bot_total_trades',
+                'pionex_bot_open_positions', 'pionex_bot_balance_usdt')
+METRIC_HEADERS = {name: f"# HELP {name} {name}\n# TYPE {name} gauge\n" for name in METRIC_NAMES}
+
+
+def ttl_cache(ttl: float = 1.0):
+    """Ergebnis einer argumentlosen Funktion für `ttl` Sekunden zwischenspeichern (gleichzeitige Scrapes teilen es)"""
+    def decorator(func):
+        lock = threading.Lock()
+        cached = [0.0, None]  # Ablaufzeit (monotonic), Ergebnis
+        
+        @wraps(func)
+        def wrapper():
+            with lock:
+                if time.monotonic() >= cached[0]:
+                    cached[1] = func()
+                    cached[0] = time.monotonic() + ttl
+                return cached[1]
+        return wrapper
+    return decorator
 
 def main():
     global bot, start_time
@@ -30,6 +60,8 @@ def main():
                        help='Configuration file path')
     parser.add_argument('--max-tests', type=int, default=None,
                        help='Maximum number of tests for optimization')
+    parser.add_argument('--genetic', action='store_true',
+                       help='Use genetic search instead of the full parameter grid for optimization')
     parser.add_argument('--duration', type=int, default=None,
                        help='Live trading duration in minutes (default: run indefinitely)')
     parser.add_argument('--port', type=int, default=5000,
@@ -47,7 +79,10 @@ def main():
     elif args.mode == 'optimize':
         print("🔧 Starting Pionex Futures Grid Bot Optimization...")
         optimizer = PionexOptimizer(args.config)
-        optimizer.run_optimization(max_tests=args.max_tests)
+        if args.genetic:
+            optimizer.run_genetic()
+        else:
+            optimizer.run_optimization(max_tests=args.max_tests)
         print("✅ Optimization completed!")
         
     elif args.mode == 'live':
@@ -60,7 +95,10 @@ def main():
         
         # Start Flask server in a separate thread
         def run_flask():
-            app.run(host='0.0.0.0', port=args.port, debug=False)
+            if serve:
+                serve(app, host='0.0.0.0', port=args.port, threads=4)
+            else:
+                app.run(host='0.0.0.0', port=args.port, debug=False, threaded=True)
         
         flask_thread = threading.Thread(target=run_flask, daemon=True)
         flask_thread.start()
@@ -73,15 +111,14 @@ def main():
             if args.duration:
                 print(f"⏰ Live trading läuft für {args.duration} Minuten...")
                 print("Drücke Ctrl+C zum vorzeitigen Stoppen")
-                time.sleep(args.duration * 60)
+                stop_event.wait(args.duration * 60)
             else:
                 print("⏰ Live trading läuft unbegrenzt...")
                 print("Drücke Ctrl+C zum Stoppen")
                 print("📱 Verwende /stop über Telegram zum Fernstoppen")
                 
-                # Keep running indefinitely
-                while True:
-                    time.sleep(60)  # Check every minute
+                # Keep running indefinitely (blockiert ohne periodisches Aufwachen, Ctrl+C unterbricht sofort)
+                stop_event.wait()
                     
         except KeyboardInterrupt:
             print("\n🛑 Stoppe Live Trading...")
@@ -90,49 +127,56 @@ def main():
             bot.stop_live_trading()
             print("✅ Live Trading gestoppt!")
 
-@app.route('/health')
-def health_check():
-    """Health check endpoint for Docker and monitoring"""
+@ttl_cache(ttl=1.0)
+def _health_payload():
+    """Health-Daten (dict, HTTP-Status), max. 1s alt"""
     try:
         # Check if bot is running
         bot_status = "running" if bot and hasattr(bot, 'is_running') and bot.is_running else "stopped"
         
-        return jsonify({
+        return {
             'status': 'healthy',
             'bot_status': bot_status,
             'timestamp': datetime.now().isoformat(),
             'uptime': str(datetime.now() - start_time) if start_time else 'unknown'
-        }), 200
+        }, 200
     except Exception as e:
-        return jsonify({
+        return {
             'status': 'unhealthy',
             'error': str(e),
             'timestamp': datetime.now().isoformat()
-        }), 500
+        }, 500
 
-@app.route('/metrics')
-def metrics():
-    """Prometheus metrics endpoint"""
+@app.route('/health')
+def health_check():
+    """Health check endpoint for Docker and monitoring"""
+    payload, status = _health_payload()
+    return jsonify(payload), status
+
+@ttl_cache(ttl=1.0)
+def _metrics_text():
+    """Prometheus-Text (body, HTTP-Status), max. 1s alt"""
     try:
         # Basic metrics for monitoring
-        metrics_data = {
-            'pionex_bot_running': 1 if bot and hasattr(bot, 'is_running') and bot.is_running else 0,
-            'pionex_bot_uptime_seconds': (datetime.now() - start_time).total_seconds() if start_time else 0,
-            'pionex_bot_total_trades': len(bot.trades) if bot and hasattr(bot, 'trades') else 0,
-            'pionex_bot_open_positions': len(bot.positions) if bot and hasattr(bot, 'positions') else 0,
-            'pionex_bot_balance_usdt': bot.balance if bot and hasattr(bot, 'balance') else 0
-        }
+        values = (
+            1 if bot and hasattr(bot, 'is_running') and bot.is_running else 0,
+            (datetime.now() - start_time).total_seconds() if start_time else 0,
+            len(bot.trades) if bot and hasattr(bot, 'trades') else 0,
+            len(bot.positions) if bot and hasattr(bot, 'positions') else 0,
+            bot.balance if bot and hasattr(bot, 'balance') else 0
+        )
         
         # Format as Prometheus metrics
-        prometheus_metrics = []
-        for metric_name, value in metrics_data.items():
-            prometheus_metrics.append(f"# HELP {metric_name} {metric_name}")
-            prometheus_metrics.append(f"# TYPE {metric_name} gauge")
-            prometheus_metrics.append(f"{metric_name} {value}")
-        
-        return '\n'.join(prometheus_metrics), 200, {'Content-Type': 'text/plain'}
+        return ''.join(f"{METRIC_HEADERS[name]}{name} {value}\n"
+                       for name, value in zip(METRIC_NAMES, values)).rstrip('\n'), 200
     except Exception as e:
-        return f"# ERROR: {str(e)}", 500, {'Content-Type': 'text/plain'}
+        return f"# ERROR: {str(e)}", 500
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics endpoint"""
+    body, status = _metrics_text()
+    return body, status, {'Content-Type': 'text/plain'}
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file